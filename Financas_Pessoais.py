@@ -1,7 +1,12 @@
 # Financas_Pessoais.py
 import streamlit as st
 import pandas as pd
-from db_manager import carregar_dados, carregar_dados_cartao
+from db_manager import carregar_dados, carregar_dados_cartao, versao_dados, iterar_registros
+from processamento import filtrar_transacoes
+from graficos import contar_paginas, paginar
+from telemetria import medir
+from exportacao import FORMATOS, blocos_de_dataframe, exportar, iniciar_limpeza_periodica
+from config import USUARIO_PADRAO
 from datetime import datetime
 
 st.set_page_config(
@@ -43,17 +48,26 @@ tipodespesa_selecionadas = st.sidebar.multiselect("Tipo de Despesa", tipodespesa
 data_inicio_dt = pd.to_datetime(st.session_state.data_inicio)
 data_fim_dt = pd.to_datetime(st.session_state.data_fim)
 
-df_filtrado = df[
-    (df['Dia'].between(data_inicio_dt, data_fim_dt)) &
-    (df['Categoria'].isin(categorias_selecionadas)) &
-    (df['F.Pagam'].isin(fpagam_selecionadas)) &
-    (df['TipoDespesa'].isin(tipodespesa_selecionadas))
-]
-
-df_despesas = df_filtrado[df_filtrado['TipoMov'] == 'Cx.Out'].copy()
-df_receitas = df_filtrado[df_filtrado['TipoMov'] == 'Cx.In'].copy()
+with medir('pagina_principal.filtro') as etapa:
+    df_filtrado = filtrar_transacoes(df, data_inicio_dt, data_fim_dt, categorias_selecionadas,
+                                     fpagam_selecionadas, tipodespesa_selecionadas)
+
+    df_despesas = df_filtrado[df_filtrado['TipoMov'] == 'Cx.Out'].copy()
+    df_receitas = df_filtrado[df_filtrado['TipoMov'] == 'Cx.In'].copy()
+    etapa.linhas = len(df_filtrado)
+
+# Especificação imutável dos filtros: junto com a versão dos dados, forma a chave
+# do cache de figuras compartilhado entre as páginas e sessões.
+filtros = (
+    str(data_inicio_dt.date()), str(data_fim_dt.date()),
+    tuple(sorted(categorias_selecionadas)),
+    tuple(sorted(fpagam_selecionadas)),
+    tuple(sorted(tipodespesa_selecionadas)),
+)
 
 st.session_state['df_completo'] = df
+st.session_state['versao_dados'] = versao_dados(df)
+st.session_state['filtros'] = filtros
 st.session_state['df_filtrado'] = df_filtrado
 st.session_state['df_despesas'] = df_despesas
 st.session_state['df_receitas'] = df_receitas
@@ -62,7 +76,8 @@ st.header("Resumo do Período Selecionado")
 
 total_gasto = df_despesas['valor'].sum()
 total_recebido = df_receitas['valor'].sum()
-user_id_fixo = "b3373108-fd8c-4670-8d4c-11b095a3f803"
+user_id_fixo = USUARIO_PADRAO
+st.session_state['user_id'] = user_id_fixo
 dados_cartao = carregar_dados_cartao(user_id=user_id_fixo)
 
 col1, col2, col3, col4 = st.columns(4)
@@ -93,6 +108,51 @@ else:
     st.info("Nenhuma despesa registrada no período selecionado.")
 
 st.markdown("### Detalhes das Transações do Período")
-st.dataframe(df_filtrado)
+# Paginação no servidor: apenas a página atual é enviada ao navegador.
+total_paginas = contar_paginas(len(df_filtrado))
+pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1, step=1)
+df_pagina, _ = paginar(df_filtrado, pagina)
+st.caption(f"{len(df_filtrado):,} transações no período")
+with medir('pagina_principal.tabela') as etapa:
+    st.dataframe(df_pagina)
+    etapa.linhas = len(df_pagina)
+
+# Apaga periodicamente as exportações vencidas, mesmo que ninguém exporte de novo.
+iniciar_limpeza_periodica()
+
+with st.expander("📤 Exportar transações filtradas"):
+    col_formato, col_fonte = st.columns(2)
+    with col_formato:
+        formato_exportacao = st.selectbox("Formato", list(FORMATOS))
+    with col_fonte:
+        direto_do_banco = st.checkbox(
+            "Ler direto do banco", value=False,
+            help="Lê o Supabase página a página com os filtros aplicados no servidor, "
+                 "em vez de usar os dados já carregados. Indicado para históricos muito grandes.")
+
+    if st.button("Gerar arquivo"):
+        if direto_do_banco:
+            blocos = iterar_registros(data_inicio_dt, data_fim_dt, categorias_selecionadas,
+                                      fpagam_selecionadas, tipodespesa_selecionadas)
+        else:
+            blocos = blocos_de_dataframe(df_filtrado)
+        try:
+            with st.spinner("Gerando arquivo..."), medir('exportacao', formato=formato_exportacao) as etapa:
+                partes = exportar(blocos, formato_exportacao)
+                etapa.linhas = sum(linhas for _, linhas in partes)
+        except ImportError as e:
+            st.error(f"Formato indisponível: instale a dependência necessária ({e.name}).")
+        else:
+            # Os arquivos são servidos pelo Streamlit direto do disco (static serving), sem passar pela
+            # memória da sessão. Exportações grandes vêm em partes, por causa do limite de 200 MB.
+            if len(partes) > 1:
+                st.info(f"A exportação foi dividida em {len(partes)} arquivos. Os links valem por 30 minutos.")
+            for numero, (nome_arquivo, linhas_exportadas) in enumerate(partes, start=1):
+                sufixo = f"_parte{numero}" if len(partes) > 1 else ""
+                nome_download = (f"transacoes_{data_inicio_dt:%Y%m%d}_{data_fim_dt:%Y%m%d}{sufixo}"
+                                 f"{FORMATOS[formato_exportacao]}")
+                st.markdown(f'<a href="app/static/exportacoes/{nome_arquivo}" download="{nome_download}">'
+                            f'⬇️ Baixar {nome_download} ({linhas_exportadas:,} transações)</a>',
+                            unsafe_allow_html=True)
 
 #streamlit run Financas_Pessoais.py
\ No newline at end of file
@@ -0,0 +1,188 @@
+# anomalias.py
+"""
+Análises determinísticas e vetorizadas do extrato: cobranças recorrentes, gastos
+atípicos por categoria (z-score robusto em janela móvel) e sazonalidade por dia da
+semana e por mês. Os resultados alimentam a Central do Dashboard e o prompt da IA.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+from telemetria import rastrear_cache, execucao_real
+
+# Periodicidades reconhecidas: nome -> (intervalo mínimo, intervalo máximo) em dias.
+PERIODICIDADES = {
+    'semanal': (6, 8),
+    'quinzenal': (13, 16),
+    'mensal': (27, 33),
+    'bimestral': (56, 65),
+    'trimestral': (85, 97),
+    'anual': (355, 375),
+}
+OCORRENCIAS_MINIMAS = 4
+# Desvio máximo (relativo à mediana) aceito entre os intervalos de uma cobrança recorrente.
+TOLERANCIA_INTERVALO = 0.25
+
+JANELA_OUTLIERS = 30
+MINIMO_JANELA = 8
+LIMITE_Z = 3.5
+# Converte o intervalo interquartil em desvio padrão equivalente para dados normais.
+FATOR_IQR = 1.349
+
+DIAS_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+MESES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+
+def detectar_recorrentes(df_despesas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Encontra cobranças recorrentes: mesmo valor e mesma categoria em intervalos regulares.
+    Cobranças que pararam antes do fim do extrato não são consideradas recorrentes.
+
+    Returns:
+        pd.DataFrame: Uma linha por cobrança recorrente com 'Categoria', 'valor',
+        'ocorrencias', 'intervalo_dias', 'periodicidade', 'ultima' e 'proxima_prevista',
+        ordenadas pelo custo mensal estimado.
+    """
+    colunas = ['Categoria', 'valor', 'ocorrencias', 'intervalo_dias', 'periodicidade', 'ultima', 'proxima_prevista']
+    if df_despesas.empty:
+        return pd.DataFrame(columns=colunas)
+
+    base = pd.DataFrame({
+        'Categoria': df_despesas['Categoria'].to_numpy(),
+        'valor': df_despesas['valor'].round(2).to_numpy(),
+        'Dia': df_despesas['Dia'].dt.normalize().to_numpy(),
+    }).drop_duplicates().sort_values(['Categoria', 'valor', 'Dia'])
+    chaves = ['Categoria', 'valor']
+    base['intervalo'] = base.groupby(chaves)['Dia'].diff().dt.days
+    # Maior afastamento de cada intervalo em relação à mediana dos intervalos da cobrança.
+    base['desvio'] = (base['intervalo'] - base.groupby(chaves)['intervalo'].transform('median')).abs()
+
+    resumo = base.groupby(chaves).agg(
+        ocorrencias=('Dia', 'size'),
+        intervalo_dias=('intervalo', 'median'),
+        desvio=('desvio', 'max'),
+        ultima=('Dia', 'max'),
+    )
+    resumo = resumo[(resumo['ocorrencias'] >= OCORRENCIAS_MINIMAS) &
+                    (resumo['desvio'] <= resumo['intervalo_dias'] * TOLERANCIA_INTERVALO)]
+
+    periodicidade = pd.Series(None, index=resumo.index, dtype=object)
+    for nome, (minimo, maximo) in PERIODICIDADES.items():
+        periodicidade[resumo['intervalo_dias'].between(minimo, maximo)] = nome
+    resumo['periodicidade'] = periodicidade
+    resumo = resumo.dropna(subset=['periodicidade'])
+
+    resumo['proxima_prevista'] = resumo['ultima'] + pd.to_timedelta(resumo['intervalo_dias'].round(), unit='D')
+    # Cobranças encerradas (ex.: assinatura cancelada): a próxima ocorrência prevista,
+    # mais a tolerância do intervalo, já passou sem acontecer até o fim do extrato.
+    folga = pd.to_timedelta((resumo['intervalo_dias'] * TOLERANCIA_INTERVALO).round(), unit='D')
+    resumo = resumo[resumo['proxima_prevista'] + folga >= base['Dia'].max()]
+    custo_mensal = resumo.index.get_level_values('valor') * 30 / resumo['intervalo_dias']
+    return resumo.assign(custo_mensal=custo_mensal).sort_values('custo_mensal', ascending=False) \
+        .reset_index()[colunas]
+
+
+def detectar_outliers(df_despesas: pd.DataFrame, janela: int = JANELA_OUTLIERS, limite: float = LIMITE_Z) -> pd.DataFrame:
+    """
+    Marca gastos atípicos dentro de cada categoria usando um z-score robusto:
+    (valor - mediana) / escala, com mediana e escala (IQR / 1,349) calculadas sobre
+    as `janela` transações anteriores da mesma categoria.
+
+    Returns:
+        pd.DataFrame: Transações com z-score acima de `limite` (colunas originais +
+        'mediana_categoria' e 'z_robusto'), do mais atípico para o menos.
+    """
+    if df_despesas.empty:
+        return df_despesas.assign(mediana_categoria=pd.Series(dtype=float), z_robusto=pd.Series(dtype=float))
+
+    ordenado = df_despesas.sort_values('Dia')
+    # Desloca um passo para que cada transação seja comparada apenas com o seu passado.
+    anteriores = ordenado.groupby('Categoria')['valor'].shift(1)
+    janelas = anteriores.groupby(ordenado['Categoria']).rolling(janela, min_periods=MINIMO_JANELA)
+    mediana = janelas.median().reset_index(level=0, drop=True)
+    escala = ((janelas.quantile(0.75) - janelas.quantile(0.25)) / FATOR_IQR).reset_index(level=0, drop=True)
+
+    z = (ordenado['valor'] - mediana) / escala.replace(0, np.nan)
+    atipicos = ordenado.assign(mediana_categoria=mediana, z_robusto=z)
+    return atipicos[atipicos['z_robusto'] > limite].sort_values('z_robusto', ascending=False)
+
+
+def sazonalidade(df_despesas: pd.DataFrame) -> dict:
+    """
+    Gasto médio por dia da semana e por mês do ano, e o índice de cada um em relação
+    à média geral (1,0 = típico; 1,3 = 30% acima da média).
+
+    Dias sem nenhum gasto entram como zero, para que a média diária não fique inflada.
+
+    Returns:
+        dict: 'dia_semana' e 'mes', cada um um DataFrame com 'media' e 'indice'.
+    """
+    vazio = pd.DataFrame(columns=['media', 'indice'])
+    if df_despesas.empty:
+        return {'dia_semana': vazio, 'mes': vazio}
+
+    diario = df_despesas.groupby(df_despesas['Dia'].dt.normalize())['valor'].sum()
+    diario = diario.reindex(pd.date_range(diario.index.min(), diario.index.max(), freq='D'), fill_value=0)
+    media_geral = diario.mean()
+
+    por_dia_semana = diario.groupby(diario.index.dayofweek).mean().reindex(range(7), fill_value=0)
+    por_dia_semana.index = DIAS_SEMANA
+    # Por mês: total de cada mês do calendário, depois a média entre os anos.
+    mensal = diario.resample('MS').sum()
+    por_mes = mensal.groupby(mensal.index.month).mean()
+    por_mes.index = [MESES[m - 1] for m in por_mes.index]
+
+    return {
+        'dia_semana': pd.DataFrame({'media': por_dia_semana,
+                                    'indice': por_dia_semana / media_geral if media_geral else 0.0}),
+        'mes': pd.DataFrame({'media': por_mes, 'indice': por_mes / por_mes.mean() if por_mes.mean() else 0.0}),
+    }
+
+
+def analisar(df_despesas: pd.DataFrame) -> dict:
+    """Executa todas as análises e retorna {'recorrentes', 'outliers', 'sazonalidade'}."""
+    return {
+        'recorrentes': detectar_recorrentes(df_despesas),
+        'outliers': detectar_outliers(df_despesas),
+        'sazonalidade': sazonalidade(df_despesas),
+    }
+
+
+@rastrear_cache('anomalias.analisar')
+@st.cache_data(max_entries=32, show_spinner=False)
+@execucao_real
+def analisar_em_cache(versao: str, filtros: tuple, _df_despesas: pd.DataFrame) -> dict:
+    """`analisar` memorizado pela versão dos dados e pelos filtros (mesma chave do cache de figuras)."""
+    return analisar(_df_despesas)
+
+
+def resumo_para_prompt(analise: dict, max_itens: int = 5) -> str:
+    """Texto compacto e factual com os resultados das análises, para o prompt da IA."""
+    linhas = []
+
+    recorrentes = analise['recorrentes'].head(max_itens)
+    if not recorrentes.empty:
+        linhas.append("Cobranças recorrentes:")
+        for r in recorrentes.itertuples():
+            linhas.append(f"- {r.Categoria}: R$ {r.valor:,.2f} {r.periodicidade} "
+                          f"({r.ocorrencias}x, próxima ~{r.proxima_prevista:%d/%m/%Y})")
+
+    outliers = analise['outliers'].head(max_itens)
+    if not outliers.empty:
+        linhas.append("Gastos atípicos (vs. mediana da categoria):")
+        for o in outliers.itertuples():
+            linhas.append(f"- {o.Dia:%d/%m/%Y} {o.Categoria}: R$ {o.valor:,.2f} "
+                          f"(típico R$ {o.mediana_categoria:,.2f})")
+
+    dia_semana = analise['sazonalidade']['dia_semana']
+    if not dia_semana.empty:
+        indices = dia_semana['indice'].astype(float)
+        linhas.append(f"Dia da semana: maior gasto {indices.idxmax()} ({indices.max():.2f}x a média), "
+                      f"menor {indices.idxmin()} ({indices.min():.2f}x).")
+
+    mes = analise['sazonalidade']['mes']
+    if len(mes) > 1:
+        indices = mes['indice'].astype(float)
+        linhas.append(f"Mês do ano: maior gasto em {indices.idxmax()} ({indices.max():.2f}x a média), "
+                      f"menor em {indices.idxmin()} ({indices.min():.2f}x).")
+
+    return "\n".join(linhas)
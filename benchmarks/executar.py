@@ -0,0 +1,180 @@
+# benchmarks/executar.py
+"""
+Suíte de benchmarks do app com extratos sintéticos.
+
+Mede, para cada tamanho de extrato, a montagem do DataFrame de 'carregar_dados',
+o filtro da página principal, cada agregação/figura da Central do Dashboard, a
+comparação de períodos, a detecção de padrões e anomalias, a previsão com Prophet
+e a geração do PDF. Os resultados são gravados em JSON e, se um baseline for
+informado, etapas mais lentas que o baseline além da tolerância são sinalizadas
+(código de saída 1).
+
+Uso:
+    python benchmarks/executar.py --tamanhos 10000 100000 1000000
+    python benchmarks/executar.py --baseline benchmarks/baseline.json --tolerancia 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from benchmarks.gerador import gerar_registros  # noqa: E402
+from processamento import montar_dataframe, filtrar_transacoes, comparar_periodos  # noqa: E402
+from graficos import CONSTRUTORES_FIGURAS  # noqa: E402
+from previsao import serie_diaria, prever_gastos, figura_previsao  # noqa: E402
+from anomalias import analisar  # noqa: E402
+from utils import gerar_pdf_completo  # noqa: E402
+
+# Acima deste tamanho o parsing é medido a partir de um DataFrame bruto em vez de
+# uma lista de dicts (a lista de dicts de 10M linhas não cabe em memória com folga).
+# Como não é o caminho de 'carregar_dados', essa medição recebe outro nome de etapa.
+LIMITE_REGISTROS_DICT = 1_000_000
+DIAS_PREVISAO = 90
+
+
+def medir(funcao, repeticoes: int) -> tuple:
+    """
+    Executa `funcao` `repeticoes` vezes.
+
+    Returns:
+        tuple[dict, object]: Mediana e mínimo (em segundos) e o resultado da última execução.
+    """
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {'mediana_s': statistics.median(tempos), 'minimo_s': min(tempos), 'repeticoes': repeticoes}, resultado
+
+
+def executar_tamanho(n_linhas: int, repeticoes: int, com_previsao: bool, pdf_com_grafico: bool) -> list:
+    """Roda todas as etapas para um extrato sintético de `n_linhas` linhas."""
+    brutos = gerar_registros(n_linhas)
+    if n_linhas <= LIMITE_REGISTROS_DICT:
+        registros, etapa_parsing = brutos.to_dict('records'), 'carregar_dados.montar_dataframe'
+    else:
+        registros, etapa_parsing = brutos, 'montar_dataframe.de_dataframe'
+    resultados = []
+
+    def registrar(etapa, funcao, reps=repeticoes):
+        """Mede a etapa e devolve o resultado da última execução, para reaproveitá-lo."""
+        medicao, resultado = medir(funcao, reps)
+        resultados.append({'etapa': etapa, 'linhas': n_linhas, **medicao})
+        print(f"  {etapa:<32} {medicao['mediana_s'] * 1000:>10.1f} ms")
+        return resultado
+
+    df = registrar(etapa_parsing, partial(montar_dataframe, registros))
+    del brutos, registros
+
+    fim = df['Dia'].max()
+    inicio = fim - pd.DateOffset(years=1)
+    categorias = df['Categoria'].unique().tolist()
+    fpagam = df['F.Pagam'].unique().tolist()
+    tipos = df['TipoDespesa'].unique().tolist()
+    registrar('pagina_principal.filtro',
+              lambda: filtrar_transacoes(df, inicio, fim, categorias, fpagam, tipos))
+
+    df_despesas = df[df['TipoMov'] == 'Cx.Out']
+    for id_grafico, construtor in CONSTRUTORES_FIGURAS.items():
+        registrar(f'dashboard.{id_grafico}', lambda c=construtor: c(df_despesas))
+    registrar('dashboard.resumo_agregado',
+              lambda: df_despesas.groupby('Categoria')['valor'].agg(['sum', 'mean', 'count']))
+
+    meio = inicio + (fim - inicio) / 2
+    registrar('dashboard.comparar_periodos',
+              lambda: comparar_periodos(df_despesas, inicio, meio, meio, fim))
+    registrar('dashboard.anomalias', lambda: analisar(df_despesas))
+
+    diaria = registrar('previsao.serie_diaria', lambda: serie_diaria(df_despesas))
+
+    tabela = None
+    figura = None
+    if com_previsao:
+        try:
+            # Uma única execução: é a etapa mais cara e o resultado alimenta o PDF.
+            previsao = registrar('previsao.prophet', lambda: prever_gastos(diaria, DIAS_PREVISAO), reps=1)
+        except ImportError as e:
+            print(f"  previsao.prophet                 ignorada ({e})")
+        else:
+            tabela = previsao[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(DIAS_PREVISAO)
+            figura = figura_previsao(previsao, diaria) if pdf_com_grafico else None
+
+    if tabela is None:
+        # Sem Prophet, o PDF é medido com uma tabela de mesmo formato montada a partir da série diária.
+        ultimos = diaria.tail(DIAS_PREVISAO)
+        tabela = pd.DataFrame({'ds': ultimos['ds'], 'yhat': ultimos['y'],
+                               'yhat_lower': ultimos['y'] * 0.8, 'yhat_upper': ultimos['y'] * 1.2})
+    texto = "Relatório sintético de benchmark. " * 200
+    registrar('relatorio.gerar_pdf_completo',
+              lambda: gerar_pdf_completo("Benchmark", texto, chart=figura, table=tabela))
+
+    return resultados
+
+
+def comparar_com_baseline(resultados: list, baseline: list, tolerancia: float) -> list:
+    """Retorna as etapas cuja mediana ficou acima de baseline * (1 + tolerancia)."""
+    referencia = {(r['etapa'], r['linhas']): r['mediana_s'] for r in baseline}
+    regressoes = []
+    for r in resultados:
+        anterior = referencia.get((r['etapa'], r['linhas']))
+        if anterior and r['mediana_s'] > anterior * (1 + tolerancia):
+            regressoes.append({**r, 'baseline_s': anterior, 'variacao': r['mediana_s'] / anterior - 1})
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Finanças Pessoais com extratos sintéticos.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Quantidades de linhas do extrato sintético (ex.: 10000 ... 10000000).")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--saida', default=os.path.join('benchmarks', 'resultados.json'))
+    parser.add_argument('--baseline', help="Arquivo JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Aumento relativo tolerado antes de sinalizar regressão (padrão: 0.2 = 20%%).")
+    parser.add_argument('--sem-previsao', action='store_true', help="Não executa o Prophet.")
+    parser.add_argument('--pdf-com-grafico', action='store_true',
+                        help="Inclui o gráfico (Kaleido) no PDF medido.")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for n_linhas in args.tamanhos:
+        print(f"Extrato sintético com {n_linhas:,} linhas")
+        resultados += executar_tamanho(n_linhas, args.repeticoes, not args.sem_previsao, args.pdf_com_grafico)
+
+    saida = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+
+    codigo_saida = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['resultados']
+        regressoes = comparar_com_baseline(resultados, baseline, args.tolerancia)
+        saida['regressoes'] = regressoes
+        for r in regressoes:
+            print(f"REGRESSÃO: {r['etapa']} ({r['linhas']:,} linhas): "
+                  f"{r['baseline_s'] * 1000:.1f} ms -> {r['mediana_s'] * 1000:.1f} ms (+{r['variacao']:.0%})")
+        codigo_saida = 1 if regressoes else 0
+
+    os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(saida, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+    return codigo_saida
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# benchmarks/gerador.py
+import numpy as np
+import pandas as pd
+
+# Categorias de despesa: (peso na quantidade de lançamentos, valor mediano em R$, tipo de despesa).
+CATEGORIAS_DESPESA = {
+    'Alimentação': (0.24, 45.0, 'Variável'),
+    'Mercado': (0.16, 180.0, 'Variável'),
+    'Transporte': (0.14, 35.0, 'Variável'),
+    'Lazer': (0.09, 90.0, 'Variável'),
+    'Saúde': (0.06, 150.0, 'Variável'),
+    'Vestuário': (0.05, 160.0, 'Variável'),
+    'Assinaturas': (0.08, 40.0, 'Fixa'),
+    'Contas': (0.08, 220.0, 'Fixa'),
+    'Educação': (0.04, 600.0, 'Fixa'),
+    'Moradia': (0.06, 1800.0, 'Fixa'),
+}
+
+# Categorias de receita: (peso, valor mediano em R$).
+CATEGORIAS_RECEITA = {
+    'Salário': (0.6, 7500.0),
+    'Rendimentos': (0.3, 120.0),
+    'Reembolso': (0.1, 80.0),
+}
+
+FORMAS_PAGAMENTO = {
+    'Cartão Crédito': 0.45,
+    'Pix': 0.30,
+    'Débito': 0.15,
+    'Boleto': 0.06,
+    'Dinheiro': 0.04,
+}
+
+# Fração dos lançamentos que são entradas de caixa.
+FRACAO_RECEITAS = 0.08
+
+
+def _normalizar(pesos) -> np.ndarray:
+    pesos = np.asarray(pesos, dtype=float)
+    return pesos / pesos.sum()
+
+
+def gerar_registros(n_linhas: int, inicio: str = '2020-01-01', fim: str = '2025-12-31',
+                    semente: int = 42) -> pd.DataFrame:
+    """
+    Gera um extrato sintético no formato bruto de 'registros1' (como devolvido pelo
+    Supabase: 'Dia' em texto ISO), com distribuições realistas de Categoria, F.Pagam,
+    TipoDespesa e valores log-normais por categoria.
+
+    Args:
+        n_linhas (int): Quantidade de lançamentos (o gerador é vetorizado; 10M linhas cabem em memória).
+        inicio (str): Primeira data do período.
+        fim (str): Última data do período.
+        semente (int): Semente do gerador aleatório, para resultados reproduzíveis.
+
+    Returns:
+        pd.DataFrame: Colunas 'id', 'Dia', 'valor', 'Categoria', 'F.Pagam', 'TipoDespesa' e 'TipoMov'.
+    """
+    rng = np.random.default_rng(semente)
+
+    dias = pd.date_range(inicio, fim, freq='D')
+    dia = dias[rng.integers(0, len(dias), n_linhas)]
+
+    eh_receita = rng.random(n_linhas) < FRACAO_RECEITAS
+
+    nomes_despesa = list(CATEGORIAS_DESPESA)
+    pesos_despesa, medianas_despesa, tipos_despesa = zip(*CATEGORIAS_DESPESA.values())
+    idx_despesa = rng.choice(len(nomes_despesa), n_linhas, p=_normalizar(pesos_despesa))
+
+    nomes_receita = list(CATEGORIAS_RECEITA)
+    pesos_receita, medianas_receita = zip(*CATEGORIAS_RECEITA.values())
+    idx_receita = rng.choice(len(nomes_receita), n_linhas, p=_normalizar(pesos_receita))
+
+    categoria = np.where(eh_receita, np.array(nomes_receita)[idx_receita], np.array(nomes_despesa)[idx_despesa])
+    mediana = np.where(eh_receita, np.array(medianas_receita)[idx_receita], np.array(medianas_despesa)[idx_despesa])
+    valor = np.round(mediana * rng.lognormal(0.0, 0.6, n_linhas), 2)
+
+    formas = list(FORMAS_PAGAMENTO)
+    fpagam = np.array(formas)[rng.choice(len(formas), n_linhas, p=_normalizar(list(FORMAS_PAGAMENTO.values())))]
+    fpagam = np.where(eh_receita, 'Pix', fpagam)
+
+    tipo_despesa = np.where(eh_receita, 'Receita', np.array(tipos_despesa)[idx_despesa])
+    tipo_mov = np.where(eh_receita, 'Cx.In', 'Cx.Out')
+
+    return pd.DataFrame({
+        'id': np.arange(1, n_linhas + 1),
+        'Dia': dia.strftime('%Y-%m-%d'),
+        'valor': valor,
+        'Categoria': categoria,
+        'F.Pagam': fpagam,
+        'TipoDespesa': tipo_despesa,
+        'TipoMov': tipo_mov,
+    })
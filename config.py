@@ -6,6 +6,9 @@ import streamlit as st
 # Carrega as variáveis do arquivo .env para o ambiente (útil para outros fins, pode manter)
 load_dotenv()
 
+# Usuário padrão do app (dono dos dados do cartão, das metas e dos relatórios pré-gerados).
+USUARIO_PADRAO = "b3373108-fd8c-4670-8d4c-11b095a3f803"
+
 # Acessa as variáveis de segredo do Streamlit usando a sintaxe de dicionário (colchetes)
 try:
     SUPABASE_URL = st.secrets["SUPABASE_URL"]
@@ -1,30 +1,66 @@
 # db_manager.py
 import streamlit as st
 import pandas as pd
+import hashlib
 from supabase import create_client, Client
 from config import SUPABASE_URL, SUPABASE_KEY
+from processamento import montar_dataframe
+from metas import registrar_novas_despesas
+from telemetria import medir, rastrear_cache, execucao_real
 
 # Inicializa a conexão com o Supabase
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
 # --- FUNÇÃO ORIGINAL (sem alterações) ---
+@rastrear_cache('db.carregar_dados')
 @st.cache_data(ttl=600)
+@execucao_real
 def carregar_dados():
-    """Busca todos os registros da tabela 'registros1' e converte para DataFrame."""
+    """
+    Busca todos os registros da tabela 'registros1' e converte para DataFrame.
+    A versão dos dados (ver `versao_dados`) é calculada aqui e guardada em `df.attrs`,
+    para que o DataFrame e a sua versão saiam sempre da mesma entrada de cache.
+    """
     try:
-        response = supabase.table("registros1").select("*").execute()
-        df = pd.DataFrame(response.data)
-        df['Dia'] = pd.to_datetime(df['Dia'])
-        df['valor'] = pd.to_numeric(df['valor'])
+        with medir('db.carregar_dados.supabase') as etapa:
+            response = supabase.table("registros1").select("*").execute()
+            etapa.linhas = len(response.data)
+        with medir('db.carregar_dados.dataframe') as etapa:
+            df = montar_dataframe(response.data)
+            etapa.linhas = len(df)
+        df.attrs['versao'] = _calcular_versao(df)
         return df
     except Exception as e:
         st.error(f"Erro ao carregar dados principais: {e}")
         return pd.DataFrame()
 
 
+# --- VERSÃO DOS DADOS (CHAVE DE CACHE PARA FIGURAS E AGREGAÇÕES) ---
+def _calcular_versao(df: pd.DataFrame) -> str:
+    if df.empty:
+        return "vazio"
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+def versao_dados(df: pd.DataFrame = None):
+    """
+    Retorna uma impressão digital (hash) do conteúdo de 'registros1'.
+    Serve como chave de cache para tudo o que é derivado dos dados principais:
+    muda sempre que os registros mudam e é igual para todas as sessões.
+
+    Passe o DataFrame retornado por `carregar_dados` na mesma execução para garantir
+    que a versão corresponde exatamente aos dados usados (sem DataFrame, consulta o cache).
+    """
+    df = carregar_dados() if df is None else df
+    return df.attrs.get('versao', "vazio")
+
+
 # --- FUNÇÃO PARA OS DADOS DO CARTÃO (VERSÃO FINAL E CORRETA) ---
+@rastrear_cache('db.carregar_dados_cartao')
 @st.cache_data(ttl=3600)
+@execucao_real
 def carregar_dados_cartao(user_id: str):
     """Busca os dados do cartão para um usuário específico."""
     if not user_id:
@@ -39,4 +75,101 @@ def carregar_dados_cartao(user_id: str):
         return None
     except Exception as e:
         st.error(f"Erro ao buscar dados do cartão: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# --- METAS DE ORÇAMENTO (POR CATEGORIA E POR MÊS) ---
+# Tabela 'metas_orcamento': criar no Supabase com o script metas_orcamento.sql.
+@rastrear_cache('db.carregar_metas')
+@st.cache_data(ttl=600)
+@execucao_real
+def carregar_metas(user_id: str):
+    """Busca as metas de orçamento cadastradas pelo usuário na tabela 'metas_orcamento'."""
+    if not user_id:
+        return []
+    try:
+        response = supabase.table("metas_orcamento").select("*").eq('user_id', user_id).execute()
+        return response.data or []
+    except Exception as e:
+        st.error(f"Erro ao carregar metas: {e}")
+        return []
+
+
+def salvar_meta(user_id: str, valor_limite: float, categoria: str = None, mes: str = None):
+    """
+    Grava uma meta de orçamento. `categoria` None vale para todas as categorias e
+    `mes` None ('AAAA-MM') faz a meta valer em todos os meses.
+    """
+    try:
+        supabase.table("metas_orcamento").insert({
+            'user_id': user_id,
+            'categoria': categoria,
+            'mes': mes,
+            'valor_limite': valor_limite,
+        }).execute()
+        carregar_metas.clear()
+        return True
+    except Exception as e:
+        st.error(f"Erro ao salvar meta: {e}")
+        return False
+
+
+def excluir_meta(meta_id):
+    """Remove uma meta de orçamento pelo seu id."""
+    try:
+        supabase.table("metas_orcamento").delete().eq('id', meta_id).execute()
+        carregar_metas.clear()
+        return True
+    except Exception as e:
+        st.error(f"Erro ao excluir meta: {e}")
+        return False
+
+
+# --- IMPORTAÇÃO EM LOTE ---
+def inserir_registros(df_registros: pd.DataFrame, tamanho_lote: int = 1000):
+    """
+    Grava novos registros em 'registros1' em lotes de `tamanho_lote` linhas (uma
+    requisição por lote). Retorna a quantidade de linhas gravadas.
+
+    As despesas de cada lote gravado são somadas aos totais correntes das metas,
+    que assim não precisam varrer o extrato de novo quando os dados recarregarem.
+    """
+    inseridos = 0
+    for inicio in range(0, len(df_registros), tamanho_lote):
+        df_lote = df_registros.iloc[inicio:inicio + tamanho_lote]
+        lote = df_lote.to_dict('records')
+        with medir('db.inserir_registros.lote') as etapa:
+            supabase.table("registros1").insert(lote).execute()
+            etapa.linhas = len(lote)
+        registrar_novas_despesas(df_lote)
+        inseridos += len(lote)
+    return inseridos
+
+
+# --- LEITURA PAGINADA (EXPORTAÇÃO) ---
+def iterar_registros(data_inicio=None, data_fim=None, categorias=None, fpagam=None, tipos_despesa=None,
+                     tamanho_pagina: int = 1000):
+    """
+    Lê 'registros1' página a página, com os filtros aplicados no próprio Supabase,
+    e devolve um DataFrame por página. Nunca mantém mais de uma página em memória.
+
+    O Supabase (PostgREST) limita cada resposta a `max-rows` linhas (1000 por padrão),
+    podendo devolver menos que `tamanho_pagina`; por isso a leitura avança pelo número
+    de linhas recebidas e só termina numa página vazia.
+    """
+    inicio = 0
+    while True:
+        consulta = supabase.table("registros1").select("*")
+        if data_inicio is not None:
+            consulta = consulta.gte('Dia', pd.Timestamp(data_inicio).strftime('%Y-%m-%d'))
+        if data_fim is not None:
+            consulta = consulta.lte('Dia', pd.Timestamp(data_fim).strftime('%Y-%m-%d'))
+        for coluna, valores in (('Categoria', categorias), ('F.Pagam', fpagam), ('TipoDespesa', tipos_despesa)):
+            if valores is not None:
+                consulta = consulta.in_(coluna, list(valores))
+        with medir('db.iterar_registros.pagina') as etapa:
+            response = consulta.order('id').range(inicio, inicio + tamanho_pagina - 1).execute()
+            etapa.linhas = len(response.data)
+        if not response.data:
+            return
+        yield montar_dataframe(response.data)
+        inicio += len(response.data)
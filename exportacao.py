@@ -0,0 +1,248 @@
+# exportacao.py
+"""
+Exportação em blocos do extrato filtrado para CSV, Parquet e Excel.
+
+Cada formato recebe um iterador de blocos (DataFrames) e grava bloco a bloco em um
+arquivo em disco, então o uso de memória depende do tamanho do bloco e não do total
+de linhas. Os arquivos são gravados em static/exportacoes, servidos pelo Streamlit
+direto do disco (enableStaticServing em .streamlit/config.toml).
+
+O static serving recusa arquivos acima de 200 MB, então exportações grandes são
+divididas em partes (cada uma um arquivo completo, com cabeçalho) e uma limpeza
+periódica apaga as exportações vencidas.
+"""
+import os
+import threading
+import time
+import uuid
+import pandas as pd
+
+TAMANHO_BLOCO = 50_000
+PASTA_EXPORTACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'exportacoes')
+# Exportações mais antigas que isso são apagadas pela limpeza periódica.
+VALIDADE_EXPORTACAO_S = 30 * 60
+INTERVALO_LIMPEZA_S = 5 * 60
+# Uma parte é fechada ao passar deste tamanho; a folga para o limite de 200 MB do
+# static serving cobre o último bloco gravado.
+TAMANHO_MAXIMO_PARTE = 150 * 1024 * 1024
+# Limite de linhas de uma planilha do Excel (incluindo o cabeçalho).
+LINHAS_POR_PLANILHA = 1_048_576
+
+# Colunas de 'registros1' usadas quando não há nenhum bloco para exportar.
+COLUNAS_REGISTROS = ['Dia', 'valor', 'Categoria', 'F.Pagam', 'TipoDespesa', 'TipoMov']
+
+FORMATOS = {
+    'CSV': '.csv',
+    'Parquet': '.parquet',
+    'Excel': '.xlsx',
+}
+
+
+def blocos_de_dataframe(df: pd.DataFrame, tamanho_bloco: int = TAMANHO_BLOCO):
+    """Percorre um DataFrame em fatias (visões, sem copiar o DataFrame inteiro)."""
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+
+def escrever_csv(blocos, arquivo):
+    """CSV no padrão brasileiro (';' e vírgula decimal), com BOM para abrir corretamente no Excel."""
+    arquivo.write(b'\xef\xbb\xbf')
+    cabecalho = True
+    linhas = 0
+    for bloco in blocos:
+        arquivo.write(bloco.to_csv(index=False, header=cabecalho, sep=';', decimal=',',
+                                   date_format='%d/%m/%Y').encode('utf-8'))
+        cabecalho = False
+        linhas += len(bloco)
+    if cabecalho:
+        # Sem linhas: só o cabeçalho, com as colunas de 'registros1' (como no Parquet).
+        arquivo.write((';'.join(COLUNAS_REGISTROS) + '\n').encode('utf-8'))
+    return linhas
+
+
+def _esquema_parquet(colunas):
+    """Esquema fixo do Parquet: 'Dia' data/hora, 'valor' float64, 'id' inteiro e as demais colunas texto."""
+    import pyarrow as pa
+
+    tipos = {'Dia': pa.timestamp('us'), 'valor': pa.float64(), 'id': pa.int64()}
+    return pa.schema([(coluna, tipos.get(coluna, pa.string())) for coluna in colunas])
+
+
+def _converter_para_esquema(bloco: pd.DataFrame, esquema):
+    """Converte um bloco para o esquema do arquivo, qualquer que seja o dtype inferido pelo pandas."""
+    import pyarrow as pa
+
+    colunas = {}
+    for campo in esquema:
+        serie = bloco[campo.name] if campo.name in bloco else pd.Series(None, index=bloco.index, dtype=object)
+        if pa.types.is_timestamp(campo.type):
+            serie = pd.to_datetime(serie)
+            if serie.dt.tz is not None:
+                serie = serie.dt.tz_convert(None)
+        elif pa.types.is_floating(campo.type):
+            serie = pd.to_numeric(serie).astype('float64')
+        elif pa.types.is_integer(campo.type):
+            serie = pd.to_numeric(serie).astype('Int64')
+        else:
+            serie = serie.astype('string')
+        colunas[campo.name] = serie
+    return pa.Table.from_pandas(pd.DataFrame(colunas), schema=esquema, preserve_index=False)
+
+
+def escrever_parquet(blocos, arquivo):
+    """
+    Parquet com um row group por bloco. O esquema é fixo (ver `_esquema_parquet`) e
+    cada bloco é convertido para ele, pois blocos vindos do banco podem ter dtypes
+    diferentes (ex.: uma página só com valores inteiros ou uma coluna toda nula).
+    """
+    import pyarrow.parquet as pq
+
+    escritor = None
+    linhas = 0
+    try:
+        for bloco in blocos:
+            if escritor is None:
+                escritor = pq.ParquetWriter(arquivo, _esquema_parquet(bloco.columns))
+            escritor.write_table(_converter_para_esquema(bloco, escritor.schema))
+            linhas += len(bloco)
+        if escritor is None:
+            # Sem linhas: grava um Parquet válido, vazio, com as colunas de 'registros1'.
+            escritor = pq.ParquetWriter(arquivo, _esquema_parquet(COLUNAS_REGISTROS))
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return linhas
+
+
+def escrever_excel(blocos, arquivo):
+    """
+    Planilha .xlsx em modo somente-escrita do openpyxl (as linhas vão direto para o
+    arquivo). Cada parte da exportação tem no máximo uma planilha cheia de linhas.
+    """
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    aba = livro.create_sheet("Transacoes")
+    cabecalho = None
+    linhas = 0
+    for bloco in blocos:
+        if cabecalho is None:
+            cabecalho = list(bloco.columns)
+            aba.append(cabecalho)
+        # NaN/NaT viram células vazias.
+        valores = bloco.astype(object).where(bloco.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            aba.append(linha)
+        linhas += len(bloco)
+    if cabecalho is None:
+        # Sem linhas: só o cabeçalho, com as colunas de 'registros1' (como no Parquet).
+        aba.append(COLUNAS_REGISTROS)
+    livro.save(arquivo)
+    return linhas
+
+
+ESCRITORES = {
+    'CSV': escrever_csv,
+    'Parquet': escrever_parquet,
+    'Excel': escrever_excel,
+}
+
+
+class _Partes:
+    """
+    Divide um iterador de blocos em partes. Uma parte termina quando o arquivo em
+    disco passa de TAMANHO_MAXIMO_PARTE ou quando atinge `max_linhas` linhas (blocos
+    são cortados se preciso). Para o Excel o tamanho só é conhecido ao salvar, então
+    vale apenas o limite de linhas.
+    """
+
+    def __init__(self, blocos, max_linhas: int = None):
+        self._blocos = iter(blocos)
+        self._pendente = None
+        self._max_linhas = max_linhas
+
+    def tem_mais(self) -> bool:
+        if self._pendente is None:
+            self._pendente = next(self._blocos, None)
+        return self._pendente is not None
+
+    def parte(self, arquivo):
+        linhas = 0
+        while arquivo.tell() < TAMANHO_MAXIMO_PARTE and self.tem_mais():
+            bloco, self._pendente = self._pendente, None
+            if self._max_linhas is not None:
+                espaco = self._max_linhas - linhas
+                if espaco <= 0:
+                    self._pendente = bloco
+                    return
+                if len(bloco) > espaco:
+                    bloco, self._pendente = bloco.iloc[:espaco], bloco.iloc[espaco:]
+            linhas += len(bloco)
+            yield bloco
+
+
+def _limpar_antigas():
+    if not os.path.isdir(PASTA_EXPORTACOES):
+        return
+    limite = time.time() - VALIDADE_EXPORTACAO_S
+    for nome in os.listdir(PASTA_EXPORTACOES):
+        caminho = os.path.join(PASTA_EXPORTACOES, nome)
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+        except OSError:
+            pass
+
+
+_limpeza_iniciada = False
+_trava_limpeza = threading.Lock()
+
+
+def iniciar_limpeza_periodica():
+    """
+    Inicia (uma vez por processo) uma thread que apaga as exportações vencidas a cada
+    INTERVALO_LIMPEZA_S, para que nenhum arquivo fique disponível além da validade.
+    """
+    global _limpeza_iniciada
+    with _trava_limpeza:
+        if _limpeza_iniciada:
+            return
+        _limpeza_iniciada = True
+
+    def laco():
+        while True:
+            _limpar_antigas()
+            time.sleep(INTERVALO_LIMPEZA_S)
+
+    threading.Thread(target=laco, name='limpeza-exportacoes', daemon=True).start()
+
+
+def exportar(blocos, formato: str) -> list:
+    """
+    Grava os blocos no formato pedido em PASTA_EXPORTACOES, em uma ou mais partes
+    (ver `_Partes`). Sempre gera ao menos um arquivo, mesmo sem linhas.
+
+    O nome de cada arquivo é aleatório, pois a pasta é servida publicamente pelo Streamlit.
+
+    Returns:
+        list[tuple[str, int]]: Nome de cada parte (relativo a PASTA_EXPORTACOES) e linhas exportadas nela.
+    """
+    iniciar_limpeza_periodica()
+    os.makedirs(PASTA_EXPORTACOES, exist_ok=True)
+    partes = _Partes(blocos, LINHAS_POR_PLANILHA - 1 if formato == 'Excel' else None)
+    gerados = []
+    caminho = None
+    try:
+        while True:
+            nome = uuid.uuid4().hex + FORMATOS[formato]
+            caminho = os.path.join(PASTA_EXPORTACOES, nome)
+            with open(caminho, 'wb') as arquivo:
+                linhas = ESCRITORES[formato](partes.parte(arquivo), arquivo)
+            gerados.append((nome, linhas))
+            if not partes.tem_mais():
+                return gerados
+    except BaseException:
+        for caminho_parte in [os.path.join(PASTA_EXPORTACOES, nome) for nome, _ in gerados] + [caminho]:
+            if caminho_parte and os.path.exists(caminho_parte):
+                os.remove(caminho_parte)
+        raise
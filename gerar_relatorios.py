@@ -0,0 +1,139 @@
+# gerar_relatorios.py
+"""
+Modo em lote: pré-gera relatórios mensais de análise preditiva fora do Streamlit.
+
+Para cada mês do intervalo, a previsão usa o histórico de despesas até o último dia
+do mês e projeta os próximos dias; o texto da IA e o PDF são gerados com o mesmo
+código da página de Análise com IA. Os meses são processados em paralelo e os
+resultados gravados em PASTA_RELATORIOS, de onde o app os serve instantaneamente.
+
+Uso:
+    python gerar_relatorios.py --inicio 2025-01 --fim 2025-06
+    python gerar_relatorios.py --inicio 2025-01 --fim 2025-06 --arquivo extrato.csv --sem-ia --processos 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from processamento import montar_dataframe
+from importacao import detectar_formato_data
+from relatorios import TITULO_RELATORIO, caminho_relatorio, criar_llm, gerar_relatorio, salvar_relatorio
+
+
+def ler_csv_local(arquivo: str) -> pd.DataFrame:
+    """
+    Lê um CSV com as colunas de 'registros1': tanto o CSV bruto da tabela (',', ponto
+    decimal, datas ISO) quanto o exportado pelo app (';', vírgula decimal, DD/MM/AAAA,
+    com BOM). Separador, separador decimal e formato da data são detectados.
+    """
+    brutos = pd.read_csv(arquivo, sep=None, engine='python', encoding='utf-8-sig', dtype=str)
+    if brutos['valor'].str.contains(',', regex=False).any():
+        brutos['valor'] = brutos['valor'].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    brutos['Dia'] = pd.to_datetime(brutos['Dia'], format=detectar_formato_data(brutos['Dia']))
+    return brutos
+
+
+def carregar_despesas(arquivo: str = None) -> pd.DataFrame:
+    """Carrega as despesas de um arquivo local (CSV/Parquet) ou, sem arquivo, do Supabase."""
+    if arquivo:
+        brutos = pd.read_parquet(arquivo) if arquivo.endswith('.parquet') else ler_csv_local(arquivo)
+        df = montar_dataframe(brutos)
+    else:
+        from db_manager import carregar_dados
+
+        df = carregar_dados()
+    if df.empty:
+        return df
+    return df[df['TipoMov'] == 'Cx.Out']
+
+
+def _chave_api():
+    chave = os.environ.get('OPENAI_API_KEY')
+    if chave:
+        return chave
+    from config import OPENAI_API_KEY
+
+    return OPENAI_API_KEY
+
+
+def _usuario_padrao():
+    usuario = os.environ.get('FINANCAS_USUARIO')
+    if usuario:
+        return usuario
+    from config import USUARIO_PADRAO
+
+    return USUARIO_PADRAO
+
+
+def gerar_periodo(user_id: str, periodo: str, df_despesas: pd.DataFrame, dias_para_prever: int,
+                  chave_api: str = None) -> tuple:
+    """Gera e grava o relatório de um mês 'AAAA-MM'. Executado em um processo separado."""
+    fim_periodo = pd.Period(periodo, freq='M').end_time
+    historico = df_despesas[df_despesas['Dia'] <= fim_periodo]
+    llm = criar_llm(chave_api) if chave_api else None
+
+    relatorio = gerar_relatorio(historico, dias_para_prever, llm=llm, titulo=f"{TITULO_RELATORIO} - {periodo}")
+    if relatorio is None:
+        return periodo, None, "histórico insuficiente"
+    if relatorio['pdf'] is None:
+        return periodo, None, "falha ao gerar o PDF (fontes não encontradas)"
+    return periodo, salvar_relatorio(user_id, periodo, dias_para_prever, relatorio), relatorio['erro_ia']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-gera relatórios mensais de análise preditiva.")
+    parser.add_argument('--inicio', required=True, help="Primeiro mês (AAAA-MM).")
+    parser.add_argument('--fim', required=True, help="Último mês (AAAA-MM).")
+    parser.add_argument('--dias', type=int, default=90, help="Dias previstos em cada relatório (padrão: 90).")
+    parser.add_argument('--usuario', help="Usuário dono dos relatórios (padrão: FINANCAS_USUARIO ou o "
+                                          "usuário padrão do app, config.USUARIO_PADRAO).")
+    parser.add_argument('--arquivo', help="Extrato local em vez do Supabase: Parquet, CSV bruto de 'registros1' "
+                                          "ou CSV exportado pelo app.")
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help="Processos em paralelo.")
+    parser.add_argument('--sem-ia', action='store_true', help="Não gera o texto da IA (apenas previsão e PDF).")
+    parser.add_argument('--forcar', action='store_true', help="Regera relatórios que já existem.")
+    args = parser.parse_args(argv)
+    args.usuario = args.usuario or _usuario_padrao()
+
+    df_despesas = carregar_despesas(args.arquivo)
+    if df_despesas.empty:
+        print("Nenhuma despesa encontrada.", file=sys.stderr)
+        return 1
+
+    periodos = [str(p) for p in pd.period_range(args.inicio, args.fim, freq='M')]
+    if not args.forcar:
+        periodos = [p for p in periodos
+                    if not os.path.exists(caminho_relatorio(args.usuario, p, args.dias) + '.pdf')]
+    if not periodos:
+        print("Todos os relatórios do intervalo já existem (use --forcar para regerar).")
+        return 0
+
+    chave_api = None if args.sem_ia else _chave_api()
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        # Cada processo recebe apenas o histórico necessário para o seu mês.
+        futuros = [
+            executor.submit(gerar_periodo, args.usuario, periodo,
+                            df_despesas[df_despesas['Dia'] <= pd.Period(periodo, freq='M').end_time],
+                            args.dias, chave_api)
+            for periodo in periodos
+        ]
+        for futuro in as_completed(futuros):
+            try:
+                periodo, caminho, aviso = futuro.result()
+            except Exception as e:
+                falhas += 1
+                print(f"ERRO: {e}", file=sys.stderr)
+                continue
+            if caminho is None:
+                falhas += 1
+                print(f"{periodo}: não gerado ({aviso})", file=sys.stderr)
+            else:
+                print(f"{periodo}: {caminho}.pdf" + (f" (texto da IA indisponível: {aviso})" if aviso else ""))
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# graficos.py
+import math
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from telemetria import rastrear_cache, execucao_real
+
+# Número máximo de pontos por série enviados ao navegador nos gráficos Plotly.
+PONTOS_MAXIMOS = 1000
+# Quantidade de linhas por página nas tabelas de transações.
+TAMANHO_PAGINA = 100
+# Figuras mantidas no cache compartilhado entre sessões (as menos usadas são descartadas).
+FIGURAS_EM_CACHE = 128
+
+
+def agregar_treemap(df_despesas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pré-agrega as despesas na hierarquia do treemap (F.Pagam → Categoria).
+
+    O Plotly recebe uma linha por folha da árvore em vez de uma por transação,
+    então o tamanho do gráfico não depende mais do tamanho do histórico.
+
+    Args:
+        df_despesas (pd.DataFrame): Despesas com as colunas 'F.Pagam', 'Categoria' e 'valor'.
+
+    Returns:
+        pd.DataFrame: Uma linha por par (F.Pagam, Categoria) com a soma de 'valor'.
+    """
+    agregado = df_despesas.groupby(['F.Pagam', 'Categoria'], as_index=False, sort=False)['valor'].sum()
+    # Folhas com valor zero não aparecem no treemap e só aumentariam o payload.
+    return agregado[agregado['valor'] != 0]
+
+
+def _eixo_numerico(serie: pd.Series) -> np.ndarray:
+    """Converte o eixo X em números para o cálculo das áreas do LTTB."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.astype('int64').to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.to_numpy(dtype=float)
+    # Eixos categóricos (ex.: 'Mes_Ano') são tratados como equidistantes.
+    return np.arange(len(serie), dtype=float)
+
+
+def reduzir_serie(df: pd.DataFrame, coluna_x: str, coluna_y: str, n_pontos: int = PONTOS_MAXIMOS) -> pd.DataFrame:
+    """
+    Reduz uma série temporal a no máximo `n_pontos` usando o algoritmo LTTB
+    (Largest-Triangle-Three-Buckets), preservando picos e vales visuais.
+
+    Args:
+        df (pd.DataFrame): Dados da série, já ordenados por `coluna_x`.
+        coluna_x (str): Coluna do eixo X (datas, números ou rótulos).
+        coluna_y (str): Coluna do eixo Y usada para escolher os pontos.
+        n_pontos (int): Orçamento de pontos da série reduzida.
+
+    Returns:
+        pd.DataFrame: Subconjunto das linhas de `df` (todas as colunas são mantidas).
+    """
+    total = len(df)
+    if n_pontos < 3 or total <= n_pontos:
+        return df
+
+    x = _eixo_numerico(df[coluna_x])
+    y = df[coluna_y].to_numpy(dtype=float)
+
+    # O primeiro e o último ponto são sempre mantidos; o restante é dividido em baldes.
+    limites = np.linspace(1, total - 1, n_pontos - 1).astype(int)
+    selecionados = np.empty(n_pontos, dtype=int)
+    selecionados[0] = 0
+    selecionados[-1] = total - 1
+
+    anterior = 0
+    for i in range(n_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Média do próximo balde (ou o último ponto, no caso do balde final).
+        prox_inicio, prox_fim = fim, limites[i + 2] if i + 2 < len(limites) else total
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        selecionados[i + 1] = anterior
+
+    return df.iloc[selecionados]
+
+
+def contar_paginas(total_linhas: int, tamanho: int = TAMANHO_PAGINA) -> int:
+    """Retorna o número de páginas necessárias para `total_linhas` (no mínimo 1)."""
+    return max(1, math.ceil(total_linhas / tamanho))
+
+
+def paginar(df: pd.DataFrame, pagina: int, tamanho: int = TAMANHO_PAGINA):
+    """
+    Recorta uma página do DataFrame no servidor, para que apenas as linhas
+    visíveis sejam enviadas ao navegador.
+
+    Args:
+        df (pd.DataFrame): Dados completos.
+        pagina (int): Número da página (começando em 1). Valores fora do intervalo são ajustados.
+        tamanho (int): Linhas por página.
+
+    Returns:
+        tuple[pd.DataFrame, int]: A fatia da página e o total de páginas.
+    """
+    total_paginas = contar_paginas(len(df), tamanho)
+    pagina = min(max(1, int(pagina)), total_paginas)
+    inicio = (pagina - 1) * tamanho
+    return df.iloc[inicio:inicio + tamanho], total_paginas
+
+
+# --- FIGURAS DA CENTRAL DO DASHBOARD ---
+def _com_mes_ano(df_despesas: pd.DataFrame) -> pd.DataFrame:
+    """Adiciona a coluna 'Mes_Ano' (AAAA-MM) usada nos gráficos mensais."""
+    return df_despesas.assign(Mes_Ano=df_despesas['Dia'].dt.to_period('M').astype(str))
+
+
+def figura_pizza_categorias(df_despesas):
+    gastos_por_categoria = df_despesas.groupby('Categoria')['valor'].sum().sort_values(ascending=False).reset_index()
+    fig_pie = px.pie(
+        gastos_por_categoria,
+        values='valor',
+        names='Categoria',
+        hole=0.4
+    )
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label', showlegend=False)
+    return fig_pie
+
+
+def figura_ranking_categorias(df_despesas):
+    gastos_por_categoria = df_despesas.groupby('Categoria')['valor'].sum().sort_values(ascending=False).reset_index()
+    fig_bar = px.bar(
+        gastos_por_categoria,
+        x='valor',
+        y='Categoria',
+        orientation='h',
+        text_auto='.2s'
+    )
+    fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'}, showlegend=False)
+    fig_bar.update_traces(textposition='outside', marker_color='#1DB954')
+    return fig_bar
+
+
+def figura_gastos_mensais(df_despesas):
+    gastos_mensais = _com_mes_ano(df_despesas).groupby('Mes_Ano')['valor'].sum().reset_index()
+    fig_line = px.line(
+        reduzir_serie(gastos_mensais.sort_values('Mes_Ano'), 'Mes_Ano', 'valor'),
+        x='Mes_Ano',
+        y='valor',
+        title='Evolução do Gasto Total',
+        labels={'valor': 'Valor Total (R$)', 'Mes_Ano': 'Mês'},
+        markers=True
+    )
+    return fig_line
+
+
+def figura_composicao_mensal(df_despesas):
+    gastos_mensais_categoria = _com_mes_ano(df_despesas).groupby(['Mes_Ano', 'Categoria'])['valor'].sum().reset_index()
+    fig_area_stack = px.area(
+        gastos_mensais_categoria.sort_values('Mes_Ano'),
+        x='Mes_Ano',
+        y='valor',
+        color='Categoria',
+        title='Composição dos Gastos por Categoria',
+        labels={'valor': 'Valor Total (R$)', 'Mes_Ano': 'Mês'}
+    )
+    return fig_area_stack
+
+
+def figura_fixo_variavel(df_despesas):
+    df_fixo_variavel = _com_mes_ano(df_despesas).groupby(['Mes_Ano', 'TipoDespesa'])['valor'].sum().reset_index()
+    fig_fv_bar = px.bar(
+        df_fixo_variavel,
+        x='Mes_Ano',
+        y='valor',
+        color='TipoDespesa',
+        title='Despesas Fixas vs. Variáveis por Mês',
+        labels={'valor': 'Valor Total (R$)', 'Mes_Ano': 'Mês', 'TipoDespesa': 'Tipo de Despesa'},
+        barmode='stack'  # Empilha as barras
+    )
+    return fig_fv_bar
+
+
+def figura_treemap_pagamento(df_despesas):
+    # Hierarquia pré-agregada: uma linha por folha (Forma de Pagamento -> Categoria)
+    fig_treemap = px.treemap(
+        agregar_treemap(df_despesas),
+        path=[px.Constant("Todos os Gastos"), 'F.Pagam', 'Categoria'],
+        values='valor',
+        title='Distribuição por Forma de Pagamento e Categoria'
+    )
+    fig_treemap.update_traces(root_color="lightgrey")
+    fig_treemap.update_layout(margin=dict(t=50, l=25, r=25, b=25))
+    return fig_treemap
+
+
+CONSTRUTORES_FIGURAS = {
+    'pizza_categorias': figura_pizza_categorias,
+    'ranking_categorias': figura_ranking_categorias,
+    'gastos_mensais': figura_gastos_mensais,
+    'composicao_mensal': figura_composicao_mensal,
+    'fixo_variavel': figura_fixo_variavel,
+    'treemap_pagamento': figura_treemap_pagamento,
+}
+
+
+@rastrear_cache('graficos.obter_figura')
+@st.cache_data(max_entries=FIGURAS_EM_CACHE, show_spinner=False)
+@execucao_real
+def obter_figura(id_grafico: str, versao: str, filtros: tuple, _df_despesas: pd.DataFrame):
+    """
+    Retorna a figura `id_grafico` construída a partir das despesas filtradas, memorizada
+    pela chave (versão dos dados, filtros, id do gráfico).
+
+    O DataFrame não entra na chave (o prefixo '_' faz o Streamlit ignorá-lo no hash):
+    ele é totalmente determinado por `versao` e `filtros`. O cache é compartilhado
+    entre sessões, então usuários com os mesmos filtros reaproveitam as mesmas figuras.
+
+    Args:
+        id_grafico (str): Uma das chaves de CONSTRUTORES_FIGURAS.
+        versao (str): Versão dos dados (ver db_manager.versao_dados).
+        filtros (tuple): Especificação imutável dos filtros da página principal.
+        _df_despesas (pd.DataFrame): Despesas já filtradas.
+    """
+    return CONSTRUTORES_FIGURAS[id_grafico](_df_despesas)
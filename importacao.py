@@ -0,0 +1,347 @@
+# importacao.py
+"""
+Pipeline de importação de extratos bancários (CSV e OFX) para 'registros1'.
+
+O arquivo é lido em blocos, normalizado para o esquema Dia/valor/Categoria/F.Pagam/
+TipoDespesa/TipoMov, categorizado por regras de palavras-chave (uma expressão
+regular por regra, aplicada de forma vetorizada sobre o bloco inteiro) e
+deduplicado contra os registros existentes por um índice de hashes.
+"""
+import io
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+TAMANHO_BLOCO = 50_000
+
+# Regras de categorização: (Categoria, TipoDespesa, palavras-chave). As palavras são
+# comparadas em maiúsculas, sem acentos e como palavras inteiras; a primeira regra
+# da lista que casar vence, independentemente da posição da palavra na descrição.
+REGRAS_CATEGORIA = [
+    ('Moradia', 'Fixa', ['ALUGUEL', 'CONDOMINIO', 'IPTU']),
+    ('Contas', 'Fixa', ['ENERGIA', 'ENEL', 'CEMIG', 'COPEL', 'SABESP', 'AGUA', 'GAS', 'VIVO', 'CLARO', 'TIM',
+                        'OI', 'INTERNET', 'NET SERVICOS']),
+    ('Assinaturas', 'Fixa', ['NETFLIX', 'SPOTIFY', 'AMAZON PRIME', 'DISNEY', 'HBO', 'YOUTUBE', 'APPLE.COM',
+                             'GOOGLE STORAGE', 'ICLOUD']),
+    ('Educação', 'Fixa', ['ESCOLA', 'COLEGIO', 'FACULDADE', 'UNIVERSIDADE', 'CURSO', 'MENSALIDADE']),
+    ('Saúde', 'Variável', ['FARMACIA', 'DROGARIA', 'DROGASIL', 'PAGUE MENOS', 'HOSPITAL', 'CLINICA', 'LABORATORIO',
+                           'UNIMED', 'AMIL', 'ODONTO']),
+    ('Mercado', 'Variável', ['SUPERMERCADO', 'MERCADO', 'ATACADAO', 'ASSAI', 'CARREFOUR', 'PAO DE ACUCAR',
+                             'HORTIFRUTI', 'SACOLAO']),
+    ('Alimentação', 'Variável', ['IFOOD', 'RESTAURANTE', 'LANCHONETE', 'PADARIA', 'PIZZARIA', 'BURGER', 'MCDONALDS',
+                                 'CAFE', 'BAR']),
+    ('Transporte', 'Variável', ['UBER', '99APP', '99 TAXI', 'POSTO', 'COMBUSTIVEL', 'SHELL', 'IPIRANGA', 'PETROBRAS',
+                                'ESTACIONAMENTO', 'PEDAGIO', 'SEM PARAR', 'METRO']),
+    ('Lazer', 'Variável', ['CINEMA', 'INGRESSO', 'SHOW', 'TEATRO', 'VIAGEM', 'HOTEL', 'AIRBNB', 'STEAM']),
+    ('Vestuário', 'Variável', ['RENNER', 'RIACHUELO', 'C&A', 'ZARA', 'CENTAURO', 'NETSHOES', 'CALCADOS']),
+]
+CATEGORIA_PADRAO = 'Outros'
+TIPO_DESPESA_PADRAO = 'Variável'
+
+# Entradas de caixa ('Cx.In') não passam pelas regras de despesa: usam estas regras de
+# categoria e sempre TipoDespesa 'Receita' (mesmo formato do gerador de benchmarks).
+REGRAS_RECEITA = [
+    ('Salário', ['SALARIO', 'PROVENTOS', 'FOLHA PGTO', 'FOLHA DE PAGAMENTO']),
+    ('Rendimentos', ['RENDIMENTO', 'RENDIMENTOS', 'JUROS', 'DIVIDENDOS', 'RESGATE']),
+    ('Reembolso', ['REEMBOLSO', 'ESTORNO', 'DEVOLUCAO']),
+]
+TIPO_RECEITA = 'Receita'
+
+# Palavras que identificam a forma de pagamento na descrição (sobrepõem a forma escolhida na importação).
+REGRAS_PAGAMENTO = [
+    ('Pix', ['PIX']),
+    ('Boleto', ['BOLETO', 'PAGTO TITULO', 'PAG TITULO']),
+    ('Débito', ['DEBITO', 'COMPRA CARTAO DEB']),
+]
+
+# Formatos de data aceitos, na ordem em que são testados pela detecção automática.
+FORMATOS_DATA = {
+    'AAAA-MM-DD (ISO)': 'ISO8601',
+    'DD/MM/AAAA': '%d/%m/%Y',
+}
+
+# Nomes de coluna aceitos em CSVs de bancos (comparados em minúsculas e sem acentos).
+COLUNAS_DATA = ['dia', 'data', 'date', 'data lancamento', 'data da transacao', 'dtposted']
+COLUNAS_VALOR = ['valor', 'amount', 'valor (r$)', 'quantia', 'trnamt']
+COLUNAS_DESCRICAO = ['descricao', 'historico', 'description', 'memo', 'lancamento', 'estabelecimento', 'name']
+
+
+def _sem_acentos_maiusculo(textos: pd.Series) -> pd.Series:
+    return (textos.fillna('').astype(str).str.upper()
+            .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii'))
+
+
+@lru_cache(maxsize=None)
+def _compilar(regras: tuple) -> tuple:
+    """Compila uma regex por regra, casando as palavras-chave apenas como palavras inteiras."""
+    return tuple(re.compile(r'\b(?:' + '|'.join(re.escape(p.strip()) for p in palavras) + r')\b')
+                 for _, palavras in regras)
+
+
+def _aplicar_regras(descricoes: pd.Series, regras: tuple) -> tuple:
+    """
+    Retorna, para cada descrição, o índice da primeira regra (na ordem da tabela) que
+    casou e uma máscara de casamento. Cada regra é testada com `Series.str.contains`
+    apenas nas descrições ainda não categorizadas.
+    """
+    indice = np.zeros(len(descricoes), dtype=np.intp)
+    casou = np.zeros(len(descricoes), dtype=bool)
+    for posicao, padrao in enumerate(_compilar(regras)):
+        pendentes = np.flatnonzero(~casou)
+        if not len(pendentes):
+            break
+        acertos = pendentes[descricoes.iloc[pendentes].str.contains(padrao).to_numpy()]
+        indice[acertos] = posicao
+        casou[acertos] = True
+    return indice, casou
+
+
+def categorizar(descricoes: pd.Series, regras=REGRAS_CATEGORIA) -> pd.DataFrame:
+    """Categoriza descrições de despesas, retornando as colunas 'Categoria' e 'TipoDespesa'."""
+    regras = tuple((nome, tipo, tuple(palavras)) for nome, tipo, palavras in regras)
+    indice, casou = _aplicar_regras(_sem_acentos_maiusculo(descricoes), tuple((r[0], r[2]) for r in regras))
+    nomes = np.array([r[0] for r in regras], dtype=object)
+    tipos = np.array([r[1] for r in regras], dtype=object)
+    return pd.DataFrame({
+        'Categoria': np.where(casou, nomes[indice], CATEGORIA_PADRAO),
+        'TipoDespesa': np.where(casou, tipos[indice], TIPO_DESPESA_PADRAO),
+    }, index=descricoes.index)
+
+
+def categorizar_receitas(descricoes: pd.Series) -> pd.DataFrame:
+    """Categoriza descrições de entradas de caixa; 'TipoDespesa' é sempre TIPO_RECEITA."""
+    regras = tuple((nome, tuple(palavras)) for nome, palavras in REGRAS_RECEITA)
+    indice, casou = _aplicar_regras(_sem_acentos_maiusculo(descricoes), regras)
+    nomes = np.array([nome for nome, _ in regras], dtype=object)
+    return pd.DataFrame({
+        'Categoria': np.where(casou, nomes[indice], CATEGORIA_PADRAO),
+        'TipoDespesa': TIPO_RECEITA,
+    }, index=descricoes.index)
+
+
+def detectar_pagamento(descricoes: pd.Series, padrao: str) -> pd.Series:
+    """Forma de pagamento por descrição; usa `padrao` quando nenhuma regra casa."""
+    regras = tuple((nome, tuple(palavras)) for nome, palavras in REGRAS_PAGAMENTO)
+    indice, casou = _aplicar_regras(_sem_acentos_maiusculo(descricoes), regras)
+    nomes = np.array([nome for nome, _ in regras], dtype=object)
+    return pd.Series(np.where(casou, nomes[indice], padrao), index=descricoes.index)
+
+
+def _converter_valor(valores: pd.Series, decimal: str) -> pd.Series:
+    """Converte valores como '1.234,56', 'R$ -10,00' ou '-10.00' em números, de forma vetorizada."""
+    if pd.api.types.is_numeric_dtype(valores):
+        return valores.astype(float)
+    texto = valores.astype(str).str.replace(r'[R$\s]', '', regex=True)
+    if decimal == ',':
+        texto = texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(texto, errors='coerce')
+
+
+def detectar_formato_data(datas: pd.Series) -> str:
+    """
+    Descobre o formato das datas de um extrato a partir de uma amostra (ex.: o primeiro
+    bloco), testando FORMATOS_DATA em ordem. O formato escolhido deve ser usado em todos
+    os blocos do arquivo, para que nenhum bloco seja interpretado de outro jeito.
+
+    Vence o primeiro formato que reconhece todas as datas; se nenhum reconhece todas
+    (ex.: uma linha de saldo no meio do extrato), vence o que reconhece mais.
+
+    Raises:
+        ValueError: Se nenhum formato reconhece as datas da amostra.
+    """
+    if pd.api.types.is_datetime64_any_dtype(datas):
+        return None
+    amostra = datas.dropna().astype(str).str.strip()
+    amostra = amostra[amostra != '']
+    reconhecidas = {formato: pd.to_datetime(amostra, format=formato, errors='coerce').notna().sum()
+                    for formato in FORMATOS_DATA.values()}
+    melhor = max(reconhecidas, key=reconhecidas.get)
+    if reconhecidas[melhor] > 0:
+        return melhor
+    exemplos = ', '.join(amostra.head(3))
+    raise ValueError(f"Formato de data não reconhecido (exemplos: {exemplos}). "
+                     f"Formatos aceitos: {', '.join(FORMATOS_DATA)}.")
+
+
+def normalizar(bloco: pd.DataFrame, forma_pagamento: str, decimal: str = ',', formato_data: str = None,
+               regras=REGRAS_CATEGORIA) -> tuple:
+    """
+    Normaliza um bloco bruto (colunas 'Dia', 'valor', 'descricao') para o esquema de 'registros1'.
+    Valores negativos viram 'Cx.Out' e positivos 'Cx.In'; 'valor' é sempre gravado positivo.
+    Saídas são categorizadas por `regras`; entradas, por `categorizar_receitas`.
+
+    As datas são lidas com `formato_data` (ver `detectar_formato_data`; None se 'Dia' já é
+    data). Linhas com data ou valor que não puderam ser lidos são rejeitadas e devolvidas
+    à parte, com o motivo; lançamentos de valor zero são ignorados.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Registros normalizados e linhas brutas
+        rejeitadas (com a coluna 'motivo').
+    """
+    if pd.api.types.is_datetime64_any_dtype(bloco['Dia']):
+        dia = bloco['Dia'].dt.normalize()
+    else:
+        dia = pd.to_datetime(bloco['Dia'], format=formato_data, errors='coerce').dt.normalize()
+    valor = _converter_valor(bloco['valor'], decimal)
+    motivo = pd.Series(np.where(dia.isna(), 'data inválida', np.where(valor.isna(), 'valor inválido', '')),
+                       index=bloco.index)
+    rejeitadas = bloco[motivo != ''].assign(motivo=motivo[motivo != ''])
+    validas = (motivo == '') & (valor != 0)
+    bloco, dia, valor = bloco[validas], dia[validas], valor[validas]
+
+    descricoes = bloco['descricao'] if 'descricao' in bloco else pd.Series('', index=bloco.index)
+    saida = (valor < 0).to_numpy()
+    categorias = pd.concat([categorizar(descricoes[saida], regras),
+                            categorizar_receitas(descricoes[~saida])]).reindex(bloco.index)
+    return pd.DataFrame({
+        'Dia': dia,
+        'valor': valor.abs().round(2),
+        'Categoria': categorias['Categoria'],
+        'F.Pagam': detectar_pagamento(descricoes, forma_pagamento),
+        'TipoDespesa': categorias['TipoDespesa'],
+        'TipoMov': np.where(valor < 0, 'Cx.Out', 'Cx.In'),
+    }), rejeitadas
+
+
+# --- LEITURA EM BLOCOS ---
+def _localizar_coluna(colunas, candidatos):
+    normalizadas = {_sem_acentos_maiusculo(pd.Series([c])).iloc[0].lower().strip(): c for c in colunas}
+    for candidato in candidatos:
+        if candidato in normalizadas:
+            return normalizadas[candidato]
+    return None
+
+
+def ler_csv_em_blocos(arquivo, separador: str = None, encoding: str = 'utf-8', tamanho_bloco: int = TAMANHO_BLOCO):
+    """
+    Lê um CSV de extrato em blocos e devolve blocos com as colunas 'Dia', 'valor' e 'descricao'.
+    As colunas são reconhecidas pelos nomes mais comuns usados pelos bancos.
+    """
+    leitor = pd.read_csv(arquivo, sep=separador, engine='python' if separador is None else 'c',
+                         encoding=encoding, dtype=str, chunksize=tamanho_bloco)
+    mapa = None
+    for bloco in leitor:
+        if mapa is None:
+            mapa = {
+                'Dia': _localizar_coluna(bloco.columns, COLUNAS_DATA),
+                'valor': _localizar_coluna(bloco.columns, COLUNAS_VALOR),
+                'descricao': _localizar_coluna(bloco.columns, COLUNAS_DESCRICAO),
+            }
+            if mapa['Dia'] is None or mapa['valor'] is None:
+                raise ValueError(f"Colunas de data/valor não encontradas no CSV: {list(bloco.columns)}")
+        yield pd.DataFrame({destino: bloco[origem] if origem else '' for destino, origem in mapa.items()})
+
+
+_CAMPOS_OFX = {
+    'Dia': r'<DTPOSTED>\s*(\d{8})',
+    'valor': r'<TRNAMT>\s*([-+]?[\d.,]+)',
+    'memo': r'<MEMO>\s*([^<\r\n]+)',
+    'nome': r'<NAME>\s*([^<\r\n]+)',
+}
+
+
+def ler_ofx_em_blocos(arquivo, encoding: str = 'latin-1', tamanho_bloco: int = TAMANHO_BLOCO,
+                      bytes_por_leitura: int = 4 * 1024 * 1024):
+    """
+    Lê um arquivo OFX (SGML ou XML) em blocos, sem carregar o arquivo inteiro.
+    O texto é lido em pedaços, separado nas transações (<STMTTRN>) e os campos são
+    extraídos com `Series.str.extract` sobre todas as transações do pedaço.
+    """
+    binario = not isinstance(arquivo, io.TextIOBase)
+    texto = io.TextIOWrapper(arquivo, encoding=encoding, errors='replace') if binario else arquivo
+    resto = ''
+    pendentes = []
+    try:
+        while True:
+            pedaco = texto.read(bytes_por_leitura)
+            fim = not pedaco
+            resto += pedaco
+            partes = re.split(r'</STMTTRN>', resto, flags=re.IGNORECASE)
+            # A última parte pode conter uma transação incompleta: fica para a próxima leitura.
+            resto = '' if fim else partes.pop()
+            pendentes.extend(p for p in partes if re.search('<STMTTRN>', p, re.IGNORECASE))
+            while len(pendentes) >= tamanho_bloco or (fim and pendentes):
+                lote, pendentes = pendentes[:tamanho_bloco], pendentes[tamanho_bloco:]
+                yield _blocos_ofx_para_dataframe(pd.Series(lote))
+            if fim:
+                break
+    finally:
+        # Solta o arquivo original sem fechá-lo (o TextIOWrapper o fecharia ao ser descartado).
+        if binario:
+            texto.detach()
+
+
+def _blocos_ofx_para_dataframe(transacoes: pd.Series) -> pd.DataFrame:
+    campos = {nome: transacoes.str.extract(padrao, flags=re.IGNORECASE)[0] for nome, padrao in _CAMPOS_OFX.items()}
+    descricao = campos['memo'].fillna(campos['nome']).fillna('').str.strip()
+    return pd.DataFrame({
+        'Dia': pd.to_datetime(campos['Dia'], format='%Y%m%d', errors='coerce'),
+        'valor': campos['valor'].str.replace(',', '.', regex=False),
+        'descricao': descricao,
+    })
+
+
+# --- DEDUPLICAÇÃO ---
+def _hash_chave(df: pd.DataFrame) -> pd.Series:
+    chave = pd.DataFrame({
+        'Dia': pd.to_datetime(df['Dia']).dt.normalize(),
+        'valor': (pd.to_numeric(df['valor']) * 100).round().astype('int64'),
+        'TipoMov': df['TipoMov'].astype(str),
+    })
+    return pd.util.hash_pandas_object(chave, index=False)
+
+
+class IndiceDeduplicacao:
+    """
+    Índice de hashes de (Dia, valor, TipoMov) dos registros já existentes.
+
+    Lançamentos idênticos no mesmo dia (ex.: dois cafés iguais) são legítimos, então o
+    índice guarda quantas vezes cada chave existe: de N ocorrências no extrato, só são
+    novas as que excedem as ocorrências já gravadas. Reimportar o mesmo arquivo não
+    duplica nada.
+    """
+
+    def __init__(self, df_existente: pd.DataFrame):
+        if df_existente is None or df_existente.empty:
+            self._existentes = pd.Series(dtype='int64')
+        else:
+            self._existentes = _hash_chave(df_existente).value_counts()
+        self._vistos = pd.Series(dtype='int64')
+
+    def filtrar_novos(self, bloco: pd.DataFrame) -> pd.DataFrame:
+        """Retorna apenas as linhas do bloco que ainda não existem e as marca como vistas."""
+        if bloco.empty:
+            return bloco
+        hashes = _hash_chave(bloco)
+        ocorrencia = hashes.groupby(hashes).cumcount().to_numpy()
+        ja_vistos = self._vistos.reindex(hashes.to_numpy(), fill_value=0).to_numpy()
+        existentes = self._existentes.reindex(hashes.to_numpy(), fill_value=0).to_numpy()
+        novos = (ja_vistos + ocorrencia) >= existentes
+        self._vistos = self._vistos.add(hashes.value_counts(), fill_value=0).astype('int64')
+        return bloco[novos]
+
+
+def processar_extrato(blocos, forma_pagamento: str, indice: IndiceDeduplicacao, decimal: str = ',',
+                      formato_data: str = None):
+    """
+    Normaliza, categoriza e deduplica cada bloco lido.
+
+    Sem `formato_data`, o formato das datas é detectado uma única vez, no primeiro
+    bloco, e usado em todos os blocos seguintes.
+
+    Yields:
+        tuple[pd.DataFrame, dict, pd.DataFrame]: Registros novos prontos para inserção
+        (Dia em 'AAAA-MM-DD'), as estatísticas do bloco ('lidas', 'validas', 'novas',
+        'rejeitadas') e as linhas rejeitadas (ver `normalizar`).
+    """
+    detectar = formato_data is None
+    for bruto in blocos:
+        if detectar:
+            formato_data = detectar_formato_data(bruto['Dia'])
+            detectar = False
+        normalizado, rejeitadas = normalizar(bruto, forma_pagamento, decimal=decimal, formato_data=formato_data)
+        novos = indice.filtrar_novos(normalizado)
+        yield novos.assign(Dia=novos['Dia'].dt.strftime('%Y-%m-%d')), {
+            'lidas': len(bruto), 'validas': len(normalizado), 'novas': len(novos),
+            'rejeitadas': len(rejeitadas)}, rejeitadas
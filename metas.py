@@ -0,0 +1,184 @@
+# metas.py
+import calendar
+import threading
+from collections import defaultdict
+from datetime import date
+import pandas as pd
+import streamlit as st
+
+# Percentual da meta a partir do qual o usuário recebe um alerta de atenção.
+LIMITE_ATENCAO = 0.8
+
+# Chave usada em TotaisCorrentes para o total do mês sem distinção de categoria.
+TODAS_CATEGORIAS = None
+
+
+class TotaisCorrentes:
+    """
+    Totais de despesas mantidos incrementalmente por (mês, categoria).
+
+    O histórico é agregado uma única vez; a partir daí cada lote de novas transações
+    atualiza apenas as chaves (mês, categoria) e (mês, total) que toca, então verificar
+    as metas depois de uma importação custa O(metas) em vez de uma nova varredura do extrato.
+    """
+
+    def __init__(self):
+        self._totais = defaultdict(float)
+        # Versão dos dados refletida nos totais (None = ainda não construídos).
+        self.versao = None
+        # Linhas (todas as movimentações) que o extrato deve ter para corresponder aos
+        # totais: as da construção mais as gravadas pelo próprio app desde então.
+        self.linhas_esperadas = 0
+        # True depois de somar lançamentos gravados pelo próprio app: a próxima versão
+        # vista é adotada sem nova varredura se tiver exatamente `linhas_esperadas` linhas.
+        self.aguardando_versao = False
+
+    @classmethod
+    def de_dataframe(cls, df_despesas: pd.DataFrame) -> "TotaisCorrentes":
+        """Constrói os totais a partir de um DataFrame de despesas ('Dia', 'Categoria', 'valor')."""
+        totais = cls()
+        if df_despesas.empty:
+            return totais
+        meses = df_despesas['Dia'].dt.strftime('%Y-%m')
+        por_categoria = df_despesas['valor'].groupby([meses, df_despesas['Categoria']]).sum()
+        for (mes, categoria), valor in por_categoria.items():
+            totais._totais[(mes, categoria)] += valor
+            totais._totais[(mes, TODAS_CATEGORIAS)] += valor
+        return totais
+
+    def registrar_dataframe(self, df_despesas: pd.DataFrame):
+        """Soma um lote de novas despesas, agregando o lote antes de atualizar os totais."""
+        if df_despesas.empty:
+            return
+        parcial = TotaisCorrentes.de_dataframe(df_despesas)
+        for chave, valor in parcial._totais.items():
+            self._totais[chave] += valor
+
+    def total(self, mes: str, categoria: str = TODAS_CATEGORIAS) -> float:
+        """Total gasto no mês (opcionalmente restrito a uma categoria)."""
+        return self._totais.get((mes, categoria), 0.0)
+
+    def meses(self) -> list:
+        """Meses com despesas registradas, em ordem crescente."""
+        return sorted({mes for mes, _ in self._totais})
+
+    def categorias(self) -> list:
+        """Categorias com despesas registradas, em ordem alfabética."""
+        return sorted({categoria for _, categoria in self._totais if categoria is not TODAS_CATEGORIAS})
+
+
+def avaliar_meta(meta: dict, totais: TotaisCorrentes, mes: str, hoje: date = None) -> dict:
+    """
+    Avalia uma meta de orçamento em um mês de referência.
+
+    A projeção usa a taxa de consumo (burn rate) do mês: gasto até agora dividido
+    pelos dias decorridos, multiplicado pelos dias do mês. Para meses já encerrados
+    a projeção é o próprio gasto.
+
+    Args:
+        meta (dict): Meta com 'valor_limite', 'categoria' (None = todas) e 'mes'
+            ('AAAA-MM', ou None para valer em todos os meses).
+        totais (TotaisCorrentes): Totais correntes de despesas.
+        mes (str): Mês de referência 'AAAA-MM' para metas recorrentes.
+        hoje (date, optional): Data atual (padrão: date.today()).
+
+    Returns:
+        dict: A meta original acrescida de 'mes_avaliado', 'gasto', 'percentual',
+        'projecao', 'taxa_diaria' e 'status' ('ok', 'atencao', 'projecao_acima' ou 'estourada').
+    """
+    hoje = hoje or date.today()
+    mes_avaliado = meta.get('mes') or mes
+    limite = float(meta['valor_limite'])
+    gasto = totais.total(mes_avaliado, meta.get('categoria') or TODAS_CATEGORIAS)
+
+    ano, numero_mes = (int(parte) for parte in mes_avaliado.split('-'))
+    dias_no_mes = calendar.monthrange(ano, numero_mes)[1]
+    if (ano, numero_mes) == (hoje.year, hoje.month):
+        dias_decorridos = hoje.day
+    elif (ano, numero_mes) < (hoje.year, hoje.month):
+        dias_decorridos = dias_no_mes
+    else:
+        dias_decorridos = 0
+
+    taxa_diaria = gasto / dias_decorridos if dias_decorridos else 0.0
+    projecao = gasto if dias_decorridos in (0, dias_no_mes) else taxa_diaria * dias_no_mes
+    percentual = gasto / limite if limite > 0 else 0.0
+
+    if gasto > limite:
+        status = 'estourada'
+    elif projecao > limite:
+        status = 'projecao_acima'
+    elif percentual >= LIMITE_ATENCAO:
+        status = 'atencao'
+    else:
+        status = 'ok'
+
+    return {
+        **meta,
+        'mes_avaliado': mes_avaliado,
+        'gasto': gasto,
+        'percentual': percentual * 100,
+        'projecao': projecao,
+        'taxa_diaria': taxa_diaria,
+        'status': status,
+    }
+
+
+def avaliar_metas(metas: list, totais: TotaisCorrentes, mes: str, hoje: date = None) -> list:
+    """Avalia todas as metas em O(len(metas)) consultando apenas os totais correntes."""
+    return [avaliar_meta(meta, totais, mes, hoje) for meta in metas]
+
+
+_trava_totais = threading.Lock()
+
+
+@st.cache_resource
+def _totais_compartilhados() -> TotaisCorrentes:
+    """Único objeto de totais do processo, compartilhado entre sessões (não depende da versão)."""
+    return TotaisCorrentes()
+
+
+def obter_totais_correntes(versao: str, df_completo: pd.DataFrame) -> TotaisCorrentes:
+    """
+    Retorna os totais correntes compartilhados, varrendo o extrato apenas quando os
+    dados mudaram por fora do app.
+
+    Uma nova versão só é adotada sem varredura quando vem de `registrar_novas_despesas`
+    e o extrato tem exatamente as linhas esperadas (as da construção mais as gravadas
+    pelo app). Qualquer diferença (escrita externa junto com uma importação, ou um lote
+    que a versão carregada já continha) reconstrói os totais.
+
+    Args:
+        versao (str): Versão atual dos dados (db_manager.versao_dados).
+        df_completo (pd.DataFrame): Extrato completo (todas as movimentações), usado só
+            quando os totais precisam ser reconstruídos.
+    """
+    totais = _totais_compartilhados()
+    with _trava_totais:
+        reaproveitar = (totais.versao is not None
+                        and (totais.versao == versao or totais.aguardando_versao)
+                        and len(df_completo) == totais.linhas_esperadas)
+        if not reaproveitar:
+            despesas = df_completo[df_completo['TipoMov'] == 'Cx.Out'] if not df_completo.empty else df_completo
+            totais._totais = TotaisCorrentes.de_dataframe(despesas)._totais
+            totais.linhas_esperadas = len(df_completo)
+        totais.versao = versao
+        totais.aguardando_versao = False
+    return totais
+
+
+def registrar_novas_despesas(df_registros: pd.DataFrame):
+    """
+    Soma aos totais compartilhados as despesas ('Cx.Out') de registros recém-gravados
+    (colunas de 'registros1', com 'Dia' em data ou 'AAAA-MM-DD').
+    Todas as linhas gravadas (inclusive receitas) entram na contagem de linhas esperadas.
+    Se os totais ainda não foram construídos, não faz nada: serão construídos do zero.
+    """
+    totais = _totais_compartilhados()
+    despesas = df_registros[df_registros['TipoMov'] == 'Cx.Out']
+    with _trava_totais:
+        if totais.versao is None or df_registros.empty:
+            return
+        totais.registrar_dataframe(despesas.assign(Dia=pd.to_datetime(despesas['Dia'])))
+        totais.linhas_esperadas += len(df_registros)
+        totais.aguardando_versao = True
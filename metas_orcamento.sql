@@ -0,0 +1,13 @@
+-- metas_orcamento.sql
+-- Tabela das metas de orçamento (pages/3_Metas.py). Executar no SQL Editor do Supabase.
+-- categoria NULL = meta para todas as categorias; mes NULL = meta válida em todos os meses.
+create table if not exists public.metas_orcamento (
+    id            bigint generated always as identity primary key,
+    user_id       uuid not null,
+    categoria     text,
+    mes           text check (mes ~ '^\d{4}-(0[1-9]|1[0-2])$'),
+    valor_limite  numeric(12, 2) not null check (valor_limite > 0),
+    criado_em     timestamptz not null default now()
+);
+
+create index if not exists metas_orcamento_user_id_idx on public.metas_orcamento (user_id);
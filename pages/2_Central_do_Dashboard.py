@@ -1,8 +1,11 @@
 # pages/2_Central_do_Dashboard.py
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 from db_manager import carregar_dados
+from graficos import obter_figura
+from processamento import comparar_periodos
+from anomalias import analisar_em_cache
+from telemetria import medir
 from datetime import datetime
 
 # --- Configuração da Página ---
@@ -21,7 +24,19 @@ if 'df_despesas' not in st.session_state or st.session_state.df_despesas.empty:
     st.warning("Nenhuma despesa encontrada para o período e filtros selecionados na página principal.")
     st.stop()
 
-df_despesas = st.session_state['df_despesas'].copy()
+df_despesas = st.session_state['df_despesas']
+
+# Chave do cache de figuras: só reconstrói um gráfico quando os dados ou os filtros mudam.
+versao = st.session_state.get('versao_dados', '')
+filtros = st.session_state.get('filtros', ())
+
+
+def mostrar_figura(id_grafico):
+    figura = obter_figura(id_grafico, versao, filtros, df_despesas)
+    # Mede a serialização da figura e o envio ao navegador.
+    with medir('dashboard.plotly_chart', grafico=id_grafico):
+        st.plotly_chart(figura, use_container_width=True)
+
 
 # --- Visualização 1: Análise de Despesas por Categoria ---
 st.header("Visão Geral das Despesas por Categoria")
@@ -29,34 +44,15 @@ st.header("Visão Geral das Despesas por Categoria")
 with st.container(border=True):
     col1, col2 = st.columns(2)
 
-    # Preparação dos dados para esta seção
-    gastos_por_categoria = df_despesas.groupby('Categoria')['valor'].sum().sort_values(ascending=False).reset_index()
-
     with col1:
         # Gráfico de Rosca (Plotly Express)
         st.subheader("Distribuição Percentual")
-        fig_pie = px.pie(
-            gastos_por_categoria,
-            values='valor',
-            names='Categoria',
-            hole=0.4
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label', showlegend=False)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        mostrar_figura('pizza_categorias')
 
     with col2:
         # Gráfico de Barras Horizontais (Plotly Express)
         st.subheader("Ranking de Gastos")
-        fig_bar = px.bar(
-            gastos_por_categoria,
-            x='valor',
-            y='Categoria',
-            orientation='h',
-            text_auto='.2s'
-        )
-        fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'}, showlegend=False)
-        fig_bar.update_traces(textposition='outside', marker_color='#1DB954')
-        st.plotly_chart(fig_bar, use_container_width=True)
+        mostrar_figura('ranking_categorias')
 
     # Tabela 2: Resumo Agregado de Despesas por Categoria
     st.subheader("Resumo Agregado por Categoria")
@@ -73,58 +69,25 @@ st.markdown("---")
 st.header("Tendência de Gastos ao Longo do Tempo")
 
 with st.container(border=True):
-    # Prepara os dados com uma coluna 'Mes_Ano'
-    df_despesas['Mes_Ano'] = df_despesas['Dia'].dt.to_period('M').astype(str)
-
     col1, col2 = st.columns(2)
 
     with col1:
         # Gráfico de Linha do total de gastos mensais
         st.subheader("Total de Despesas Mensais")
-        gastos_mensais = df_despesas.groupby('Mes_Ano')['valor'].sum().reset_index()
-        fig_line = px.line(
-            gastos_mensais.sort_values('Mes_Ano'),
-            x='Mes_Ano',
-            y='valor',
-            title='Evolução do Gasto Total',
-            labels={'valor': 'Valor Total (R$)', 'Mes_Ano': 'Mês'},
-            markers=True
-        )
-        st.plotly_chart(fig_line, use_container_width=True)
+        mostrar_figura('gastos_mensais')
 
     with col2:
         # Gráfico de Área Empilhada por Categoria
         st.subheader("Composição Mensal das Despesas")
-        gastos_mensais_categoria = df_despesas.groupby(['Mes_Ano', 'Categoria'])['valor'].sum().reset_index()
-        fig_area_stack = px.area(
-            gastos_mensais_categoria.sort_values('Mes_Ano'),
-            x='Mes_Ano',
-            y='valor',
-            color='Categoria',
-            title='Composição dos Gastos por Categoria',
-            labels={'valor': 'Valor Total (R$)', 'Mes_Ano': 'Mês'}
-        )
-        st.plotly_chart(fig_area_stack, use_container_width=True)
+        mostrar_figura('composicao_mensal')
 
 # --- Visualização 3: Comparativo Fixo vs. Variável ---
 st.markdown("---")
 st.header("Análise de Despesas Fixas vs. Variáveis")
 
 with st.container(border=True):
-    # Prepara os dados agrupando por mês e Tipo de Despesa
-    df_fixo_variavel = df_despesas.groupby(['Mes_Ano', 'TipoDespesa'])['valor'].sum().reset_index()
-
     st.subheader("Comparativo Mensal")
-    fig_fv_bar = px.bar(
-        df_fixo_variavel,
-        x='Mes_Ano',
-        y='valor',
-        color='TipoDespesa',
-        title='Despesas Fixas vs. Variáveis por Mês',
-        labels={'valor': 'Valor Total (R$)', 'Mes_Ano': 'Mês', 'TipoDespesa': 'Tipo de Despesa'},
-        barmode='stack'  # Empilha as barras
-    )
-    st.plotly_chart(fig_fv_bar, use_container_width=True)
+    mostrar_figura('fixo_variavel')
 
 # --- Visualização 4: Distribuição de Valores por Tipo de Pagamento ---
 st.markdown("---")
@@ -133,15 +96,48 @@ st.header("Análise por Forma de Pagamento")
 with st.container(border=True):
     st.subheader("Composição dos Gastos")
     # Treemap para Tipo de Pagamento e Categoria
-    fig_treemap = px.treemap(
-        df_despesas,
-        path=[px.Constant("Todos os Gastos"), 'F.Pagam', 'Categoria'],  # Hierarquia: Forma de Pagamento -> Categoria
-        values='valor',
-        title='Distribuição por Forma de Pagamento e Categoria'
-    )
-    fig_treemap.update_traces(root_color="lightgrey")
-    fig_treemap.update_layout(margin=dict(t=50, l=25, r=25, b=25))
-    st.plotly_chart(fig_treemap, use_container_width=True)
+    mostrar_figura('treemap_pagamento')
+
+# --- Visualização 5: Padrões e Anomalias ---
+st.markdown("---")
+st.header("Padrões e Anomalias")
+
+with st.container(border=True):
+    analise = analisar_em_cache(versao, filtros, df_despesas)
+
+    st.subheader("Cobranças Recorrentes")
+    recorrentes = analise['recorrentes']
+    if recorrentes.empty:
+        st.info("Nenhuma cobrança recorrente (mesmo valor e categoria em intervalos regulares) encontrada.")
+    else:
+        st.dataframe(recorrentes.rename(columns={
+            'valor': 'Valor', 'ocorrencias': 'Ocorrências', 'intervalo_dias': 'Intervalo (dias)',
+            'periodicidade': 'Periodicidade', 'ultima': 'Última', 'proxima_prevista': 'Próxima Prevista'
+        }).style.format({'Valor': 'R${:,.2f}', 'Intervalo (dias)': '{:.0f}', 'Última': '{:%d/%m/%Y}',
+                         'Próxima Prevista': '{:%d/%m/%Y}'}), use_container_width=True, hide_index=True)
+
+    st.subheader("Gastos Atípicos por Categoria")
+    outliers = analise['outliers']
+    if outliers.empty:
+        st.info("Nenhum gasto fora do padrão da sua categoria no período.")
+    else:
+        st.dataframe(outliers[['Dia', 'Categoria', 'F.Pagam', 'valor', 'mediana_categoria', 'z_robusto']].head(50)
+                     .rename(columns={'valor': 'Valor', 'mediana_categoria': 'Valor Típico', 'z_robusto': 'Z Robusto'})
+                     .style.format({'Dia': '{:%d/%m/%Y}', 'Valor': 'R${:,.2f}', 'Valor Típico': 'R${:,.2f}',
+                                    'Z Robusto': '{:.1f}'}), use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Gasto Médio por Dia da Semana")
+        dia_semana = analise['sazonalidade']['dia_semana'].reset_index(names='Dia da Semana')
+        fig_semana = px.bar(dia_semana, x='Dia da Semana', y='media',
+                            labels={'media': 'Gasto Médio Diário (R$)'})
+        st.plotly_chart(fig_semana, use_container_width=True)
+    with col2:
+        st.subheader("Gasto Médio por Mês do Ano")
+        mes = analise['sazonalidade']['mes'].reset_index(names='Mês')
+        fig_mes = px.bar(mes, x='Mês', y='media', labels={'media': 'Gasto Médio Mensal (R$)'})
+        st.plotly_chart(fig_mes, use_container_width=True)
 
 # --- SEÇÃO FINAL: Análise Comparativa de Períodos (CÓDIGO MANTIDO) ---
 st.markdown("---")
@@ -162,19 +158,9 @@ with st.expander("Clique aqui para selecionar os períodos e comparar", expanded
         pb_fim = st.date_input("Fim B", value=datetime(2025, 5, 31), key="pb_fim")
 
     if st.button("Comparar Períodos"):
-        df_pa = df_despesas_completo[
-            df_despesas_completo['Dia'].between(pd.to_datetime(pa_inicio), pd.to_datetime(pa_fim))]
-        df_pb = df_despesas_completo[
-            df_despesas_completo['Dia'].between(pd.to_datetime(pb_inicio), pd.to_datetime(pb_fim))]
-
-        gastos_pa = df_pa.groupby('Categoria')['valor'].sum().rename("Gasto Período A")
-        gastos_pb = df_pb.groupby('Categoria')['valor'].sum().rename("Gasto Período B")
-
-        df_merged = pd.merge(gastos_pa, gastos_pb, on='Categoria', how='outer').fillna(0)
-        df_merged['Variacao Absoluta'] = df_merged['Gasto Período B'] - df_merged['Gasto Período A']
-        df_merged['Variacao Percentual'] = (df_merged['Variacao Absoluta'] / df_merged['Gasto Período A'].replace(0,
-                                                                                                                  pd.NA)) * 100
-        df_merged = df_merged[(df_merged['Gasto Período A'] > 0) | (df_merged['Gasto Período B'] > 0)]
+        with medir('dashboard.comparar_periodos') as etapa:
+            df_merged = comparar_periodos(df_despesas_completo, pa_inicio, pa_fim, pb_inicio, pb_fim)
+            etapa.linhas = len(df_merged)
 
         if df_merged.empty:
             st.warning("Nenhuma despesa encontrada para comparação.")
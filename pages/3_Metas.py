@@ -2,6 +2,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from db_manager import carregar_dados, versao_dados, carregar_metas, salvar_meta, excluir_meta
+from metas import obter_totais_correntes, avaliar_metas
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -105,4 +107,81 @@ with col2:
         )
         # Mensagem de erro, consistente com a situação.
         st.error(f"Atenção! Você ultrapassou sua meta em R$ {abs(valor_restante):,.2f}.")
-    #versao3
\ No newline at end of file
+
+# --- Metas por Categoria e por Mês ---
+st.markdown("---")
+st.header("Metas por Categoria e por Mês")
+
+df_completo = carregar_dados()
+user_id = st.session_state.get('user_id')
+
+# Totais por (mês, categoria) mantidos incrementalmente: avaliar as metas não varre o extrato.
+totais = obter_totais_correntes(versao_dados(df_completo), df_completo)
+meses_disponiveis = totais.meses()
+
+if not meses_disponiveis:
+    st.info("Nenhuma despesa registrada para acompanhar metas.")
+    st.stop()
+
+mes_referencia = st.selectbox("Mês de referência", meses_disponiveis[::-1])
+
+with st.expander("Cadastrar nova meta"):
+    with st.form("nova_meta", clear_on_submit=True):
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            categoria_meta = st.selectbox(
+                "Categoria", ["Todas as categorias"] + totais.categorias())
+        with col_b:
+            mes_meta = st.selectbox("Mês", ["Todos os meses"] + meses_disponiveis[::-1])
+        with col_c:
+            valor_meta = st.number_input("Limite (R$)", min_value=0.01, value=500.0, step=50.0, format="%.2f")
+        if st.form_submit_button("Salvar meta"):
+            salvo = salvar_meta(
+                user_id, valor_meta,
+                categoria=None if categoria_meta == "Todas as categorias" else categoria_meta,
+                mes=None if mes_meta == "Todos os meses" else mes_meta,
+            )
+            if salvo:
+                st.success("Meta salva!")
+
+resultados = avaliar_metas(carregar_metas(user_id), totais, mes_referencia)
+
+if not resultados:
+    st.info("Nenhuma meta cadastrada. Use o formulário acima para criar metas por categoria ou por mês.")
+else:
+    # Alertas do mais grave para o mais leve.
+    gravidade = {'estourada': 0, 'projecao_acima': 1, 'atencao': 2, 'ok': 3}
+    resultados.sort(key=lambda r: gravidade[r['status']])
+    for resultado in resultados:
+        nome = resultado.get('categoria') or "Todas as categorias"
+        descricao = f"**{nome}** ({resultado['mes_avaliado']})"
+        if resultado['status'] == 'estourada':
+            st.error(f"{descricao}: meta ultrapassada em R$ {resultado['gasto'] - float(resultado['valor_limite']):,.2f}.")
+        elif resultado['status'] == 'projecao_acima':
+            st.warning(f"{descricao}: no ritmo atual (R$ {resultado['taxa_diaria']:,.2f}/dia) o mês deve fechar em "
+                       f"R$ {resultado['projecao']:,.2f}, acima da meta de R$ {float(resultado['valor_limite']):,.2f}.")
+        elif resultado['status'] == 'atencao':
+            st.warning(f"{descricao}: {resultado['percentual']:.2f}% da meta já utilizada.")
+
+    df_resultados = pd.DataFrame(resultados)
+    df_resultados['valor_limite'] = df_resultados['valor_limite'].astype(float)
+    df_resultados['categoria'] = df_resultados['categoria'].fillna("Todas as categorias")
+    df_resultados = df_resultados.rename(columns={
+        'categoria': 'Categoria', 'mes_avaliado': 'Mês', 'valor_limite': 'Meta (R$)', 'gasto': 'Gasto (R$)',
+        'percentual': 'Utilizado (%)', 'projecao': 'Projeção (R$)', 'status': 'Situação'
+    })
+    colunas = ['Categoria', 'Mês', 'Meta (R$)', 'Gasto (R$)', 'Utilizado (%)', 'Projeção (R$)', 'Situação']
+    st.dataframe(df_resultados[colunas].style.format({
+        'Meta (R$)': 'R${:,.2f}', 'Gasto (R$)': 'R${:,.2f}', 'Projeção (R$)': 'R${:,.2f}', 'Utilizado (%)': '{:,.2f}%'
+    }), use_container_width=True)
+
+    with st.expander("Excluir meta"):
+        opcoes = {
+            f"{r.get('categoria') or 'Todas as categorias'} - {r.get('mes') or 'Todos os meses'} "
+            f"(R$ {float(r['valor_limite']):,.2f})": r['id']
+            for r in resultados
+        }
+        escolhida = st.selectbox("Meta", list(opcoes))
+        if st.button("Excluir"):
+            if excluir_meta(opcoes[escolhida]):
+                st.rerun()
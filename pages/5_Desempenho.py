@@ -0,0 +1,89 @@
+# pages/5_Desempenho.py
+import json
+import os
+import streamlit as st
+import pandas as pd
+import telemetria
+
+# --- Configuração da Página ---
+st.set_page_config(
+    page_title="Desempenho",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+st.title("⏱️ Painel de Desempenho")
+st.markdown("---")
+
+# A telemetria vale para o processo inteiro (todas as sessões) e grava em disco, então
+# ligar/desligar e limpar as medições só é permitido com FINANCAS_ADMIN=1.
+admin = os.environ.get('FINANCAS_ADMIN', '').lower() in ('1', 'true', 'sim')
+
+# --- Controle da Telemetria ---
+ligada = st.toggle("Telemetria ativa", value=telemetria.ativa(), disabled=not admin,
+                   help="Quando desligada, a instrumentação custa apenas a checagem de um booleano."
+                        + ("" if admin else " Somente administradores (FINANCAS_ADMIN=1) podem alterar."))
+if admin and ligada != telemetria.ativa():
+    telemetria.ativar(ligada)
+    st.rerun()
+
+registros = telemetria.registros()
+
+if not registros:
+    st.info("Nenhuma medição registrada ainda. Ative a telemetria e navegue pelas páginas do app.")
+    st.stop()
+
+df = pd.DataFrame(registros)
+df['linhas'] = pd.to_numeric(df['linhas'])
+df['memoria_delta_mb'] = pd.to_numeric(df['memoria_delta_mb'])
+df['atributos'] = df['atributos'].astype(str)
+
+# --- Resumo por Etapa ---
+st.header("Resumo por Etapa")
+
+with st.container(border=True):
+    resumo = df.groupby('nome').agg(
+        chamadas=('duracao_ms', 'size'),
+        total_ms=('duracao_ms', 'sum'),
+        mediana_ms=('duracao_ms', 'median'),
+        p95_ms=('duracao_ms', lambda d: d.quantile(0.95)),
+        max_ms=('duracao_ms', 'max'),
+        linhas_medias=('linhas', 'mean'),
+        cache_hits=('cache', lambda c: (c == 'hit').sum()),
+        cache_misses=('cache', lambda c: (c == 'miss').sum()),
+        memoria_delta_media_mb=('memoria_delta_mb', 'mean'),
+        memoria_delta_max_mb=('memoria_delta_mb', 'max'),
+    ).sort_values('total_ms', ascending=False)
+    st.dataframe(resumo.style.format({
+        'total_ms': '{:,.1f}', 'mediana_ms': '{:,.1f}', 'p95_ms': '{:,.1f}', 'max_ms': '{:,.1f}',
+        'linhas_medias': '{:,.0f}', 'memoria_delta_media_mb': '{:+,.1f}', 'memoria_delta_max_mb': '{:+,.1f}'
+    }, na_rep='-'), use_container_width=True)
+
+    memoria = df['memoria_mb'].dropna()
+    if not memoria.empty:
+        st.metric("Memória Atual do Processo", f"{memoria.iloc[-1]:,.1f} MB")
+
+# --- Medições Recentes ---
+st.markdown("---")
+st.header("Medições Recentes")
+
+with st.container(border=True):
+    colunas = ['nome', 'duracao_ms', 'linhas', 'cache', 'memoria_mb', 'memoria_delta_mb', 'erro', 'atributos']
+    st.dataframe(df[colunas].iloc[::-1].head(200), use_container_width=True)
+
+# --- Exportação ---
+st.markdown("---")
+st.header("Exportar Medições")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.download_button("Baixar JSON lines", data="\n".join(json.dumps(r, ensure_ascii=False, default=str)
+                                                          for r in registros),
+                       file_name="telemetria.jsonl", mime="application/x-ndjson", use_container_width=True)
+with col2:
+    st.download_button("Baixar OpenTelemetry (OTLP/JSON)", data=json.dumps(telemetria.para_otlp(registros)),
+                       file_name="telemetria_otlp.json", mime="application/json", use_container_width=True)
+with col3:
+    if st.button("Limpar medições", use_container_width=True, disabled=not admin):
+        telemetria.limpar()
+        st.rerun()
@@ -0,0 +1,118 @@
+# pages/6_Importar_Extratos.py
+import streamlit as st
+import pandas as pd
+from db_manager import carregar_dados, inserir_registros
+from importacao import (FORMATOS_DATA, IndiceDeduplicacao, detectar_formato_data, ler_csv_em_blocos,
+                        ler_ofx_em_blocos, processar_extrato)
+from telemetria import medir
+
+# --- Configuração da Página ---
+st.set_page_config(
+    page_title="Importar Extratos",
+    page_icon="📥",
+    layout="wide"
+)
+
+st.title("📥 Importação de Extratos Bancários")
+st.markdown("---")
+
+st.markdown(
+    "Envie um extrato em **CSV** ou **OFX**. Os lançamentos são categorizados automaticamente, "
+    "os que já existem na base são ignorados e os novos são gravados em lotes."
+)
+
+arquivo = st.file_uploader("Arquivo do extrato", type=["csv", "ofx"])
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    forma_pagamento = st.selectbox("Forma de pagamento padrão",
+                                   ["Cartão Crédito", "Débito", "Pix", "Boleto", "Dinheiro"],
+                                   help="Usada quando a descrição do lançamento não indica a forma de pagamento.")
+with col2:
+    separador = st.selectbox("Separador (CSV)", ["Automático", ";", ",", "\\t"])
+with col3:
+    decimal = st.selectbox("Separador decimal (CSV)", [",", "."])
+with col4:
+    opcao_data = st.selectbox("Formato da data (CSV)", ["Automático"] + list(FORMATOS_DATA),
+                              help="No modo automático o formato é detectado uma vez, no início do arquivo, "
+                                   "e usado para todas as linhas.")
+
+if arquivo is None:
+    st.stop()
+
+eh_ofx = arquivo.name.lower().endswith('.ofx')
+
+
+def ler_blocos():
+    arquivo.seek(0)
+    if eh_ofx:
+        return ler_ofx_em_blocos(arquivo)
+    sep = {"Automático": None, "\\t": "\t"}.get(separador, separador)
+    return ler_csv_em_blocos(arquivo, separador=sep)
+
+
+# O OFX usa sempre ponto decimal.
+decimal_efetivo = '.' if eh_ofx else decimal
+df_existente = carregar_dados()
+
+# --- Pré-visualização do Primeiro Bloco ---
+st.header("Pré-visualização")
+try:
+    primeiro_bloco = next(ler_blocos(), pd.DataFrame(columns=['Dia', 'valor', 'descricao']))
+    # O formato da data é definido uma vez para o arquivo inteiro (prévia e importação).
+    if opcao_data == "Automático":
+        formato_data = detectar_formato_data(primeiro_bloco['Dia'])
+    else:
+        formato_data = FORMATOS_DATA[opcao_data]
+    previa, _, rejeitadas_previa = next(processar_extrato([primeiro_bloco.head(50)], forma_pagamento,
+                                                          IndiceDeduplicacao(df_existente),
+                                                          decimal=decimal_efetivo, formato_data=formato_data))
+    st.dataframe(previa, use_container_width=True)
+    if not rejeitadas_previa.empty:
+        st.warning(f"{len(rejeitadas_previa)} linha(s) da prévia não puderam ser lidas e serão rejeitadas:")
+        st.dataframe(rejeitadas_previa, use_container_width=True)
+except ValueError as e:
+    st.error(f"Não foi possível ler o extrato: {e}")
+    st.stop()
+
+# --- Importação ---
+if st.button("Importar Lançamentos", type="primary", use_container_width=True):
+    indice = IndiceDeduplicacao(df_existente)
+    totais = {'lidas': 0, 'validas': 0, 'novas': 0, 'rejeitadas': 0, 'gravadas': 0}
+    amostra_rejeitadas = []
+    progresso = st.progress(0.0, text="Importando...")
+    tamanho_arquivo = max(arquivo.size, 1)
+
+    try:
+        with medir('importacao.extrato', arquivo=arquivo.name):
+            for novos, estatisticas, rejeitadas in processar_extrato(ler_blocos(), forma_pagamento, indice,
+                                                                     decimal=decimal_efetivo,
+                                                                     formato_data=formato_data):
+                for chave, valor in estatisticas.items():
+                    totais[chave] += valor
+                if not rejeitadas.empty and sum(map(len, amostra_rejeitadas)) < 100:
+                    amostra_rejeitadas.append(rejeitadas)
+                totais['gravadas'] += inserir_registros(novos)
+                # A posição no arquivo é aproximada (leitura com buffer), suficiente para a barra.
+                progresso.progress(min(arquivo.tell() / tamanho_arquivo, 1.0),
+                                   text=f"{totais['lidas']:,} lançamentos lidos...")
+    except Exception as e:
+        st.error(f"Erro durante a importação (lançamentos já gravados: {totais['gravadas']:,}): {e}")
+    finally:
+        progresso.empty()
+        if totais['gravadas']:
+            # Os dados mudaram: invalida o cache para que todas as páginas vejam os novos registros.
+            carregar_dados.clear()
+
+    col_a, col_b, col_c, col_d, col_e = st.columns(5)
+    col_a.metric("Lidos", f"{totais['lidas']:,}")
+    col_b.metric("Válidos", f"{totais['validas']:,}")
+    col_c.metric("Rejeitados", f"{totais['rejeitadas']:,}")
+    col_d.metric("Já existentes", f"{totais['validas'] - totais['novas']:,}")
+    col_e.metric("Gravados", f"{totais['gravadas']:,}")
+    if amostra_rejeitadas:
+        st.warning(f"{totais['rejeitadas']:,} lançamento(s) rejeitado(s) por data ou valor ilegível "
+                   "(não foram gravados). Primeiros exemplos:")
+        st.dataframe(pd.concat(amostra_rejeitadas).head(100), use_container_width=True)
+    if totais['gravadas']:
+        st.success("Importação concluída! Volte à página principal para ver os novos lançamentos.")
@@ -0,0 +1,56 @@
+# previsao.py
+import pandas as pd
+import plotly.graph_objects as go
+from graficos import reduzir_serie
+from telemetria import medido
+
+# Mínimo de dias com gastos para que a previsão seja considerada confiável.
+DIAS_MINIMOS = 10
+
+
+def serie_diaria(df_despesas: pd.DataFrame) -> pd.DataFrame:
+    """Soma as despesas por dia no formato esperado pelo Prophet (colunas 'ds' e 'y')."""
+    df_preditivo = df_despesas[['Dia', 'valor']].rename(columns={'Dia': 'ds', 'valor': 'y'})
+    return df_preditivo.groupby('ds').sum().reset_index()
+
+
+@medido('previsao.prophet')
+def prever_gastos(df_preditivo_diario: pd.DataFrame, dias_para_prever: int) -> pd.DataFrame:
+    """
+    Ajusta um modelo Prophet (com feriados do Brasil) à série diária e projeta
+    `dias_para_prever` dias à frente.
+
+    Returns:
+        pd.DataFrame: Previsão completa do Prophet ('ds', 'yhat', 'yhat_lower', 'yhat_upper', ...).
+    """
+    # Importado aqui porque o Prophet é pesado e só é necessário quando há previsão.
+    from prophet import Prophet
+
+    modelo = Prophet(daily_seasonality=True)
+    modelo.add_country_holidays(country_name='BR')
+    modelo.fit(df_preditivo_diario)
+    futuro = modelo.make_future_dataframe(periods=dias_para_prever)
+    return modelo.predict(futuro)
+
+
+@medido('previsao.figura')
+def figura_previsao(previsao: pd.DataFrame, df_preditivo_diario: pd.DataFrame) -> go.Figure:
+    """Monta o gráfico da projeção (faixa mínimo/máximo, previsão e gastos reais)."""
+    # Séries reduzidas a um orçamento de pontos para manter o JSON do gráfico limitado.
+    previsao_grafico = reduzir_serie(previsao, 'ds', 'yhat')
+    reais_grafico = reduzir_serie(df_preditivo_diario, 'ds', 'y')
+
+    fig_pred = go.Figure()
+    fig_pred.add_trace(go.Scatter(x=previsao_grafico['ds'], y=previsao_grafico['yhat_upper'], fill=None,
+                                  mode='lines', line_color='rgba(0,176,246,0.2)', name='Máximo Previsto'))
+    fig_pred.add_trace(go.Scatter(x=previsao_grafico['ds'], y=previsao_grafico['yhat_lower'], fill='tonexty',
+                                  mode='lines', line_color='rgba(0,176,246,0.2)', name='Mínimo Previsto'))
+    fig_pred.add_trace(
+        go.Scatter(x=previsao_grafico['ds'], y=previsao_grafico['yhat'], mode='lines',
+                   line=dict(color='cyan', width=3), name='Previsão'))
+    fig_pred.add_trace(go.Scatter(x=reais_grafico['ds'], y=reais_grafico['y'], mode='markers',
+                                  marker=dict(color='yellow', size=5), name='Gastos Reais'))
+    fig_pred.update_layout(title_text="Projeção de Gastos Futuros vs. Histórico", xaxis_title="Data",
+                           yaxis_title="Valor Gasto (R$)",
+                           legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig_pred
@@ -0,0 +1,46 @@
+# processamento.py
+import pandas as pd
+
+
+def montar_dataframe(registros) -> pd.DataFrame:
+    """
+    Converte os registros brutos de 'registros1' (lista de dicts vinda do Supabase,
+    ou um DataFrame no mesmo formato) no DataFrame usado pelo app, com 'Dia' como
+    data e 'valor' como número.
+    """
+    df = pd.DataFrame(registros)
+    df['Dia'] = pd.to_datetime(df['Dia'])
+    df['valor'] = pd.to_numeric(df['valor'])
+    return df
+
+
+def filtrar_transacoes(df: pd.DataFrame, data_inicio, data_fim, categorias, fpagam, tipos_despesa) -> pd.DataFrame:
+    """Aplica os filtros da barra lateral da página principal (período, categoria, pagamento e tipo)."""
+    return df[
+        (df['Dia'].between(pd.to_datetime(data_inicio), pd.to_datetime(data_fim))) &
+        (df['Categoria'].isin(categorias)) &
+        (df['F.Pagam'].isin(fpagam)) &
+        (df['TipoDespesa'].isin(tipos_despesa))
+    ]
+
+
+def comparar_periodos(df_despesas: pd.DataFrame, pa_inicio, pa_fim, pb_inicio, pb_fim) -> pd.DataFrame:
+    """
+    Compara os gastos por categoria entre dois períodos (A e B).
+
+    Returns:
+        pd.DataFrame: Indexado por 'Categoria', com os gastos de cada período e as
+        variações absoluta e percentual de B em relação a A. Categorias sem gasto
+        em nenhum dos dois períodos são removidas.
+    """
+    df_pa = df_despesas[df_despesas['Dia'].between(pd.to_datetime(pa_inicio), pd.to_datetime(pa_fim))]
+    df_pb = df_despesas[df_despesas['Dia'].between(pd.to_datetime(pb_inicio), pd.to_datetime(pb_fim))]
+
+    gastos_pa = df_pa.groupby('Categoria')['valor'].sum().rename("Gasto Período A")
+    gastos_pb = df_pb.groupby('Categoria')['valor'].sum().rename("Gasto Período B")
+
+    df_merged = pd.merge(gastos_pa, gastos_pb, on='Categoria', how='outer').fillna(0)
+    df_merged['Variacao Absoluta'] = df_merged['Gasto Período B'] - df_merged['Gasto Período A']
+    df_merged['Variacao Percentual'] = (df_merged['Variacao Absoluta'] /
+                                        df_merged['Gasto Período A'].replace(0, pd.NA)) * 100
+    return df_merged[(df_merged['Gasto Período A'] > 0) | (df_merged['Gasto Período B'] > 0)]
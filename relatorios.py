@@ -0,0 +1,154 @@
+# relatorios.py
+"""
+Geração do relatório de análise preditiva (previsão, texto da IA e PDF) sem depender
+da interface, usada tanto pela página de Análise com IA quanto pelo modo em lote
+(gerar_relatorios.py), e o armazenamento local dos relatórios pré-gerados.
+"""
+import json
+import os
+import re
+from datetime import datetime
+import pandas as pd
+from previsao import DIAS_MINIMOS, serie_diaria, prever_gastos, figura_previsao
+from utils import gerar_pdf_completo
+from telemetria import medir
+from anomalias import analisar, resumo_para_prompt
+
+MODELO_LLM = "gpt-4.1-mini"
+# Pasta onde os relatórios pré-gerados ficam disponíveis para o app.
+PASTA_RELATORIOS = os.environ.get('FINANCAS_RELATORIOS',
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), 'relatorios'))
+TITULO_RELATORIO = "Relatório de Análise Preditiva de Gastos"
+
+
+def criar_llm(api_key: str):
+    """Cria o cliente do modelo de linguagem usado na análise explicativa."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(api_key=api_key, model=MODELO_LLM, temperature=0.3, max_tokens=2000)
+
+
+def resumo_categorias(df_despesas: pd.DataFrame, quantidade: int = 5) -> str:
+    """Linha com as maiores categorias de gasto do histórico."""
+    top_categorias = df_despesas.groupby('Categoria')['valor'].sum().nlargest(quantidade)
+    return "; ".join(f"{categoria} R$ {total:,.2f}" for categoria, total in top_categorias.items())
+
+
+def montar_prompt(df_despesas: pd.DataFrame, dias_para_prever: int, df_previsao_tabela: pd.DataFrame) -> str:
+    """
+    Monta o prompt da análise explicativa. Picos, recorrências, gastos atípicos e
+    sazonalidade são calculados deterministicamente (anomalias.py) e enviados já
+    prontos, em vez de pedir ao modelo que os infira.
+    """
+    total_previsto = df_previsao_tabela['yhat'].sum()
+    picos = df_previsao_tabela.nlargest(3, 'yhat')
+    volatilidade = ((df_previsao_tabela['yhat_upper'] - df_previsao_tabela['yhat_lower']).mean() /
+                    max(df_previsao_tabela['yhat'].abs().mean(), 0.01))
+
+    dados = [
+        f"- Previsão para os próximos {dias_para_prever} dias: total R$ {total_previsto:,.2f}; amplitude média "
+        f"do intervalo de confiança {volatilidade:.0%} do valor diário previsto.",
+        "- Maiores picos previstos: " + "; ".join(f"{p.ds:%d/%m/%Y} R$ {p.yhat:,.2f}" for p in picos.itertuples()),
+        f"- Maiores categorias no histórico: {resumo_categorias(df_despesas)}",
+        resumo_para_prompt(analisar(df_despesas)),
+    ]
+
+    return (
+        "Você é um analista financeiro sênior, especialista em finanças pessoais. Escreva, em português e em "
+        "markdown, um relatório acionável com as seções: ### 1. Resumo Executivo da Projeção; ### 2. Picos de "
+        "Gastos (relacione os picos previstos às cobranças recorrentes e categorias abaixo); ### 3. Tendências e "
+        "Padrões (sazonalidade, gastos atípicos, volatilidade); ### 4. Recomendações (pelo menos 3, específicas "
+        "para as categorias e cobranças citadas). Use apenas os dados abaixo, sem inventar valores. Tom "
+        "profissional e encorajador.\n\n"
+        "DADOS:\n" + "\n".join(dados)
+    )
+
+
+def gerar_texto_analise(llm, prompt: str) -> str:
+    """Envia o prompt ao modelo e retorna o texto da análise."""
+    from langchain_core.output_parsers import StrOutputParser
+
+    chain = llm | StrOutputParser()
+    with medir('ia.llm', caracteres_prompt=len(prompt)):
+        return chain.invoke(prompt)
+
+
+def gerar_relatorio(df_despesas: pd.DataFrame, dias_para_prever: int, llm=None, titulo: str = TITULO_RELATORIO):
+    """
+    Executa todo o fluxo do relatório: previsão, gráfico, texto da IA (se `llm` for
+    informado) e PDF.
+
+    Returns:
+        dict | None: Chaves 'figura', 'tabela', 'texto', 'erro_ia' e 'pdf'; None se o
+        histórico tiver menos de DIAS_MINIMOS dias com gastos.
+    """
+    df_preditivo_diario = serie_diaria(df_despesas)
+    if len(df_preditivo_diario) < DIAS_MINIMOS:
+        return None
+
+    previsao = prever_gastos(df_preditivo_diario, dias_para_prever)
+    figura = figura_previsao(previsao, df_preditivo_diario)
+    tabela = previsao[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(dias_para_prever)
+
+    texto, erro_ia = None, None
+    if llm is not None:
+        try:
+            texto = gerar_texto_analise(llm, montar_prompt(df_despesas, dias_para_prever, tabela))
+        except Exception as e:
+            erro_ia = str(e)
+
+    pdf = gerar_pdf_completo(titulo, texto or "A análise textual não pôde ser gerada.", chart=figura, table=tabela)
+    return {'figura': figura, 'tabela': tabela, 'texto': texto, 'erro_ia': erro_ia, 'pdf': pdf}
+
+
+# --- ARMAZENAMENTO LOCAL DOS RELATÓRIOS PRÉ-GERADOS ---
+def _pasta_usuario(user_id: str) -> str:
+    # Evita que o id do usuário seja interpretado como caminho.
+    return os.path.join(PASTA_RELATORIOS, re.sub(r'[^\w-]', '_', user_id or 'padrao'))
+
+
+def caminho_relatorio(user_id: str, periodo: str, dias_para_prever: int) -> str:
+    """Caminho (sem extensão) do relatório de um período 'AAAA-MM' e horizonte de previsão."""
+    return os.path.join(_pasta_usuario(user_id), f"{periodo}_{dias_para_prever}d")
+
+
+def salvar_relatorio(user_id: str, periodo: str, dias_para_prever: int, relatorio: dict) -> str:
+    """
+    Grava o PDF e os metadados (texto da IA e tabela da previsão) do relatório.
+    A gravação é atômica: os arquivos só aparecem para o app depois de completos.
+    """
+    base = caminho_relatorio(user_id, periodo, dias_para_prever)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    metadados = {
+        'periodo': periodo,
+        'dias_para_prever': dias_para_prever,
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'texto': relatorio['texto'],
+        'erro_ia': relatorio['erro_ia'],
+        'tabela': relatorio['tabela'].assign(ds=relatorio['tabela']['ds'].dt.strftime('%Y-%m-%d'))
+                                     .to_dict('records'),
+    }
+    for extensao, conteudo, modo in (('.pdf', relatorio['pdf'], 'wb'),
+                                     ('.json', json.dumps(metadados, ensure_ascii=False), 'w')):
+        temporario = base + extensao + '.tmp'
+        with open(temporario, modo, **({} if 'b' in modo else {'encoding': 'utf-8'})) as f:
+            f.write(conteudo)
+        os.replace(temporario, base + extensao)
+    return base
+
+
+def listar_relatorios(user_id: str) -> list:
+    """Relatórios pré-gerados do usuário (metadados + caminho do PDF), do período mais recente ao mais antigo."""
+    pasta = _pasta_usuario(user_id)
+    if not os.path.isdir(pasta):
+        return []
+    relatorios = []
+    for nome in sorted(os.listdir(pasta), reverse=True):
+        if not nome.endswith('.json'):
+            continue
+        base = os.path.join(pasta, nome[:-len('.json')])
+        if not os.path.exists(base + '.pdf'):
+            continue
+        with open(base + '.json', encoding='utf-8') as f:
+            relatorios.append({**json.load(f), 'caminho_pdf': base + '.pdf'})
+    return relatorios
@@ -0,0 +1,235 @@
+# telemetria.py
+"""
+Instrumentação leve dos caminhos críticos do app (busca no Supabase, montagem de
+DataFrames, filtros, agregações, serialização Plotly, Prophet, LLM e Kaleido).
+
+Cada etapa medida gera um registro com latência, linhas, acerto/falha de cache e
+variação da memória residente durante a etapa. Os registros ficam num buffer em
+memória (lido pela página de Desempenho) e, opcionalmente, são gravados em um
+arquivo JSON lines local.
+
+Desativada por padrão: cada ponto instrumentado custa apenas a checagem de um
+booleano. Para ativar, defina FINANCAS_TELEMETRIA=1 ou use `ativar()`.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# Quantidade de registros mantidos em memória para a página de Desempenho.
+TAMANHO_BUFFER = 5000
+
+_ativa = os.environ.get('FINANCAS_TELEMETRIA', '').lower() in ('1', 'true', 'sim')
+_arquivo = os.environ.get('FINANCAS_TELEMETRIA_ARQUIVO', 'telemetria.jsonl')
+_registros = deque(maxlen=TAMANHO_BUFFER)
+_trava_arquivo = threading.Lock()
+_local = threading.local()
+
+
+def ativa() -> bool:
+    return _ativa
+
+
+def ativar(ligar: bool = True, arquivo: str = None):
+    """Liga/desliga a telemetria. `arquivo` define o JSON lines de saída (None mantém o atual; '' desliga a gravação)."""
+    global _ativa, _arquivo
+    _ativa = ligar
+    if arquivo is not None:
+        _arquivo = arquivo
+
+
+def registros() -> list:
+    """Cópia dos registros em memória, do mais antigo para o mais recente."""
+    return list(_registros)
+
+
+def limpar():
+    _registros.clear()
+
+
+_PAGINA_MB = os.sysconf('SC_PAGE_SIZE') / (1024 * 1024) if hasattr(os, 'sysconf') else None
+
+
+def _memoria_atual_mb():
+    """Memória residente (RSS) atual do processo, lida de /proc (Linux). None em outros sistemas."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGINA_MB
+    except (OSError, TypeError, ValueError, IndexError):
+        return None
+
+
+def _gravar(registro: dict):
+    _registros.append(registro)
+    if not _arquivo:
+        return
+    try:
+        with _trava_arquivo, open(_arquivo, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+    except OSError:
+        pass
+
+
+class _Etapa:
+    """Etapa em medição. Atributos extras (ex.: `linhas`, `cache`) podem ser definidos dentro do bloco."""
+
+    def __init__(self, nome: str, atributos: dict):
+        self.nome = nome
+        self.atributos = atributos
+        self.linhas = None
+        self.cache = None
+
+    def __enter__(self):
+        pilha = getattr(_local, 'pilha', None)
+        if pilha is None:
+            pilha = _local.pilha = []
+        self.pai = pilha[-1] if pilha else None
+        self.trace_id = self.pai.trace_id if self.pai else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        pilha.append(self)
+        self._memoria_inicio = _memoria_atual_mb()
+        self.inicio_ns = time.time_ns()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_erro, erro, _tb):
+        duracao = time.perf_counter() - self._inicio
+        memoria = _memoria_atual_mb()
+        _local.pilha.pop()
+        _gravar({
+            'nome': self.nome,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'pai_id': self.pai.span_id if self.pai else None,
+            'inicio_ns': self.inicio_ns,
+            'duracao_ms': round(duracao * 1000, 3),
+            'linhas': self.linhas,
+            'cache': self.cache,
+            'memoria_mb': round(memoria, 1) if memoria is not None else None,
+            # Positivo: a etapa deixou memória alocada; inclui o que as etapas filhas alocaram.
+            'memoria_delta_mb': round(memoria - self._memoria_inicio, 1)
+            if memoria is not None and self._memoria_inicio is not None else None,
+            'erro': repr(erro) if erro else None,
+            'atributos': self.atributos,
+        })
+        return False
+
+
+class _EtapaInativa:
+    """Substituto sem custo usado quando a telemetria está desligada."""
+    linhas = None
+    cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+
+_INATIVA = _EtapaInativa()
+
+
+def medir(nome: str, **atributos):
+    """
+    Context manager que mede uma etapa:
+
+        with medir('pagina_principal.filtro') as etapa:
+            df_filtrado = ...
+            etapa.linhas = len(df_filtrado)
+    """
+    if not _ativa:
+        return _INATIVA
+    return _Etapa(nome, atributos)
+
+
+def _contar_linhas(resultado):
+    try:
+        return len(resultado) if hasattr(resultado, 'shape') else None
+    except TypeError:
+        return None
+
+
+def medido(nome: str):
+    """Decorator equivalente a `medir`; registra automaticamente as linhas de DataFrames retornados."""
+    def decorador(funcao):
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not _ativa:
+                return funcao(*args, **kwargs)
+            with _Etapa(nome, {}) as etapa:
+                resultado = funcao(*args, **kwargs)
+                etapa.linhas = _contar_linhas(resultado)
+                return resultado
+        return envoltorio
+    return decorador
+
+
+def execucao_real(funcao):
+    """
+    Marca a execução real de uma função em cache. Vai *abaixo* de @st.cache_data /
+    @st.cache_resource, em conjunto com `rastrear_cache` acima deles.
+    """
+    @wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        _local.executou = True
+        return funcao(*args, **kwargs)
+    return envoltorio
+
+
+def rastrear_cache(nome: str):
+    """
+    Mede uma função em cache do Streamlit e registra acerto ('hit') ou falha ('miss'):
+
+        @rastrear_cache('db.carregar_dados')
+        @st.cache_data(ttl=600)
+        @execucao_real
+        def carregar_dados(): ...
+    """
+    def decorador(funcao_em_cache):
+        @wraps(funcao_em_cache)
+        def envoltorio(*args, **kwargs):
+            if not _ativa:
+                return funcao_em_cache(*args, **kwargs)
+            with _Etapa(nome, {}) as etapa:
+                anterior = getattr(_local, 'executou', False)
+                _local.executou = False
+                resultado = funcao_em_cache(*args, **kwargs)
+                etapa.cache = 'miss' if _local.executou else 'hit'
+                _local.executou = anterior
+                etapa.linhas = _contar_linhas(resultado)
+                return resultado
+        # Mantém o acesso a .clear() das funções em cache do Streamlit.
+        if hasattr(funcao_em_cache, 'clear'):
+            envoltorio.clear = funcao_em_cache.clear
+        return envoltorio
+    return decorador
+
+
+def para_otlp(lista_registros: list, servico: str = 'financas-pessoais') -> dict:
+    """Converte registros no formato JSON do OpenTelemetry (OTLP/JSON, ExportTraceServiceRequest)."""
+    spans = []
+    for r in lista_registros:
+        atributos = {**r['atributos'], 'linhas': r['linhas'], 'cache': r['cache'],
+                     'memoria_mb': r['memoria_mb'], 'memoria_delta_mb': r['memoria_delta_mb']}
+        spans.append({
+            'traceId': r['trace_id'],
+            'spanId': r['span_id'],
+            'parentSpanId': r['pai_id'] or '',
+            'name': r['nome'],
+            'kind': 1,
+            'startTimeUnixNano': str(r['inicio_ns']),
+            'endTimeUnixNano': str(r['inicio_ns'] + int(r['duracao_ms'] * 1_000_000)),
+            'attributes': [{'key': chave, 'value': {'stringValue': str(valor)}}
+                           for chave, valor in atributos.items() if valor is not None],
+            'status': {'code': 2, 'message': r['erro']} if r['erro'] else {'code': 1},
+        })
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': servico}}]},
+        'scopeSpans': [{'scope': {'name': 'telemetria'}, 'spans': spans}],
+    }]}
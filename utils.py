@@ -1,10 +1,14 @@
 # utils.py
 from fpdf import FPDF
+from fpdf.enums import XPos, YPos
 import pandas as pd
+import streamlit as st
+from telemetria import medir, medido
 import os
 import io
 
 
+@medido('pdf.gerar_pdf')
 def gerar_pdf(texto_analise: str):
     """
     Gera um arquivo PDF simples a partir de uma string de texto, usando o padrão UTF-8
@@ -40,6 +44,7 @@ def gerar_pdf(texto_analise: str):
     return bytes(pdf.output())
 
 
+@medido('pdf.gerar_pdf_avancado')
 def gerar_pdf_avancado(titulo: str, texto_analise: str, figura_bytes: io.BytesIO = None, tabela: pd.DataFrame = None):
     """
     Gera um relatório PDF completo com título, texto, um gráfico e uma tabela de dados.
@@ -125,4 +130,97 @@ def gerar_pdf_avancado(titulo: str, texto_analise: str, figura_bytes: io.BytesIO
             pdf.ln()
             fill = not fill
 
-    return bytes(pdf.output())
\ No newline at end of file
+    return bytes(pdf.output())
+
+
+# --- FUNÇÃO AUXILIAR PARA CARREGAR AS FONTES ---
+def add_dejavu_fonts(pdf_instance):
+    font_dir = os.path.join(os.path.dirname(__file__), 'static', 'fonts')
+
+    if not os.path.isdir(font_dir):
+        st.error(f"ERRO CRÍTICO: Diretório de fontes não encontrado: {font_dir}")
+        return False
+
+    font_map = {
+        '': 'DejaVuSans.ttf',
+        'B': 'DejaVuSans-Bold.ttf',
+        'I': 'DejaVuSans-Oblique.ttf',
+        'BI': 'DejaVuSans-BoldOblique.ttf'
+    }
+
+    all_fonts_found = True
+    for style, filename in font_map.items():
+        font_file_path = os.path.join(font_dir, filename)
+        if os.path.exists(font_file_path):
+            pdf_instance.add_font('DejaVu', style, font_file_path)
+        else:
+            st.error(f"ARQUIVO DE FONTE ESSENCIAL NÃO ENCONTRADO: {font_file_path}")
+            all_fonts_found = False
+
+    return all_fonts_found
+
+
+# --- FUNÇÃO DE PDF COM CORREÇÃO FINAL ---
+@medido('pdf.gerar_pdf_completo')
+def gerar_pdf_completo(titulo, texto_analise, chart=None, table=None):
+    pdf = FPDF()
+
+    if not add_dejavu_fonts(pdf):
+        st.error("Geração do PDF cancelada: falha ao carregar fontes customizadas.")
+        return None
+
+    pdf.add_page()
+
+    pdf.set_font('DejaVu', 'B', 16)
+    pdf.multi_cell(0, 10, titulo, align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(5)
+
+    # A análise de texto agora é tratada de forma mais robusta para UTF-8
+    pdf.set_font('DejaVu', '', 11)
+    pdf.multi_cell(0, 8, texto_analise)
+    pdf.ln(10)
+
+    if chart:
+        try:
+            pdf.add_page()
+            pdf.set_font('DejaVu', "B", 12)
+            pdf.cell(0, 10, "Gráfico da Análise", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.ln(5)
+            img_bytes = io.BytesIO()
+            with medir('pdf.kaleido'):
+                chart.write_image(img_bytes, format="png", width=900, height=400, scale=2)
+            img_bytes.seek(0)
+            pdf.image(img_bytes, x=10, w=190)
+        except Exception as e:
+            pdf.set_text_color(255, 0, 0)
+            pdf.multi_cell(0, 10,
+                           f"ATENÇÃO: Erro ao renderizar o gráfico. Verifique se 'kaleido' está instalado. Erro: {e}")
+            pdf.set_text_color(0, 0, 0)
+
+    if table is not None and not table.empty:
+        pdf.add_page()
+        pdf.set_font('DejaVu', "B", 12)
+        pdf.cell(0, 10, "Dados Detalhados da Previsão", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(5)
+
+        df_table_str = table.copy().rename(
+            columns={'ds': 'Data', 'yhat': 'Previsao_R', 'yhat_lower': 'Minimo_R', 'yhat_upper': 'Maximo_R'})
+        df_table_str['Data'] = df_table_str['Data'].dt.strftime('%d/%m/%Y')
+
+        col_widths = {'Data': 35, 'Previsao_R': 45, 'Minimo_R': 50, 'Maximo_R': 55}
+        header = ['Data', 'Previsao_R', 'Minimo_R', 'Maximo_R']
+
+        pdf.set_font('DejaVu', 'B', 9)
+        for col_name in header:
+            pdf.cell(col_widths.get(col_name, 40), 10, col_name.replace('_', ' '), border=1, align='C')
+        pdf.ln()
+
+        pdf.set_font('DejaVu', '', 8)
+        for _, row in df_table_str.iterrows():
+            pdf.cell(col_widths['Data'], 10, str(row['Data']), border=1, align='C')
+            pdf.cell(col_widths['Previsao_R'], 10, f"R$ {row['Previsao_R']:,.2f}", border=1, align='R')
+            pdf.cell(col_widths['Minimo_R'], 10, f"R$ {row['Minimo_R']:,.2f}", border=1, align='R')
+            pdf.cell(col_widths['Maximo_R'], 10, f"R$ {row['Maximo_R']:,.2f}", border=1, align='R', new_x=XPos.LMARGIN,
+                     new_y=YPos.NEXT)
+
+    return bytes(pdf.output())